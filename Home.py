@@ -4,11 +4,15 @@ Professional Data Science Platform with MLOps Practices
 """
 
 import streamlit as st
+import html
+import re
 import sys
 from pathlib import Path
 
-# Setup path
-sys.path.insert(0, str(Path(__file__).parent))
+# Setup path (guarded: Streamlit re-executes this script on every rerun)
+_ROOT_DIR = str(Path(__file__).parent)
+if _ROOT_DIR not in sys.path:
+    sys.path.insert(0, _ROOT_DIR)
 
 from core.auth import check_authentication
 from config.settings import APP_NAME, APP_VERSION, APP_AUTHOR
@@ -21,10 +25,22 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Web font: preconnect + stylesheet link so the fetch starts in parallel instead of after CSS parse
+_FONT_LINKS = (
+    '<link rel="preconnect" href="https://fonts.googleapis.com">'
+    '<link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>'
+    '<link rel="stylesheet" href="https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700;800&display=swap">'
+)
+
 # Modern Professional CSS
-st.markdown("""
+_CSS = """
 <style>
-    @import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700;800&display=swap');
+    /* Shared design tokens */
+    :root {
+        --brand-grad: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+        --card-shadow: 0 4px 20px rgba(0,0,0,0.08);
+        --card-border: 1px solid #e8ecf4;
+    }
     
     /* Global Styles */
     * {
@@ -43,7 +59,7 @@ st.markdown("""
     
     /* Main Header */
     .main-header {
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+        background: var(--brand-grad);
         padding: 2.5rem 2rem;
         border-radius: 20px;
         margin-bottom: 2rem;
@@ -95,8 +111,8 @@ st.markdown("""
         border-radius: 16px;
         padding: 1.5rem;
         margin-bottom: 2rem;
-        box-shadow: 0 4px 20px rgba(0,0,0,0.08);
-        border: 1px solid #e8ecf4;
+        box-shadow: var(--card-shadow);
+        border: var(--card-border);
     }
     
     .user-info-card h3 {
@@ -117,7 +133,7 @@ st.markdown("""
     
     .user-info-card .badge {
         display: inline-block;
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+        background: var(--brand-grad);
         color: white;
         padding: 0.25rem 0.75rem;
         border-radius: 20px;
@@ -139,8 +155,8 @@ st.markdown("""
         border-radius: 16px;
         padding: 2rem 1.5rem;
         text-align: center;
-        box-shadow: 0 4px 20px rgba(0,0,0,0.08);
-        border: 1px solid #e8ecf4;
+        box-shadow: var(--card-shadow);
+        border: var(--card-border);
         transition: all 0.3s ease;
         position: relative;
         overflow: hidden;
@@ -153,7 +169,7 @@ st.markdown("""
         left: 0;
         right: 0;
         height: 4px;
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+        background: var(--brand-grad);
     }
     
     .stats-card:hover {
@@ -165,7 +181,7 @@ st.markdown("""
         font-size: 3rem;
         font-weight: 800;
         margin: 0;
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+        background: var(--brand-grad);
         -webkit-background-clip: text;
         -webkit-text-fill-color: transparent;
         background-clip: text;
@@ -183,9 +199,9 @@ st.markdown("""
         background: white;
         padding: 2rem;
         border-radius: 16px;
-        box-shadow: 0 4px 20px rgba(0,0,0,0.08);
+        box-shadow: var(--card-shadow);
         margin: 1rem 0;
-        border: 1px solid #e8ecf4;
+        border: var(--card-border);
         transition: all 0.3s ease;
         position: relative;
         overflow: hidden;
@@ -198,7 +214,7 @@ st.markdown("""
         left: 0;
         width: 4px;
         height: 100%;
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+        background: var(--brand-grad);
     }
     
     .feature-card:hover {
@@ -248,6 +264,12 @@ st.markdown("""
         font-size: 1.1rem;
     }
     
+    .features-grid {
+        display: grid;
+        grid-template-columns: repeat(auto-fit, minmax(320px, 1fr));
+        gap: 0 1.5rem;
+    }
+    
     /* Section Headers */
     .section-header {
         font-size: 2rem;
@@ -263,7 +285,7 @@ st.markdown("""
         content: '';
         width: 4px;
         height: 2rem;
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+        background: var(--brand-grad);
         border-radius: 2px;
     }
     
@@ -272,10 +294,16 @@ st.markdown("""
         background: white;
         border-radius: 12px;
         padding: 1.5rem;
-        border: 1px solid #e8ecf4;
+        border: var(--card-border);
         box-shadow: 0 2px 10px rgba(0,0,0,0.05);
     }
     
+    .nav-grid {
+        display: grid;
+        grid-template-columns: repeat(auto-fit, minmax(220px, 1fr));
+        gap: 1.5rem;
+    }
+    
     .info-box strong {
         color: #667eea;
         font-weight: 600;
@@ -286,7 +314,7 @@ st.markdown("""
         text-align: center;
         padding: 3rem 2rem;
         margin-top: 4rem;
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+        background: var(--brand-grad);
         color: white;
         border-radius: 20px;
         box-shadow: 0 10px 40px rgba(102, 126, 234, 0.3);
@@ -305,7 +333,7 @@ st.markdown("""
     
     /* Buttons */
     .stButton > button {
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+        background: var(--brand-grad);
         color: white;
         border: none;
         border-radius: 12px;
@@ -325,7 +353,7 @@ st.markdown("""
     .streamlit-expanderHeader {
         background: white;
         border-radius: 12px;
-        border: 1px solid #e8ecf4;
+        border: var(--card-border);
         font-weight: 600;
         color: #1a202c;
     }
@@ -339,16 +367,197 @@ st.markdown("""
         background: white;
         border-radius: 12px;
         padding: 1rem 2rem;
-        border: 1px solid #e8ecf4;
+        border: var(--card-border);
         font-weight: 600;
     }
     
     .stTabs [aria-selected="true"] {
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+        background: var(--brand-grad);
         color: white;
     }
 </style>
-""", unsafe_allow_html=True)
+"""
+
+# Minified once at import: strip comments, collapse whitespace
+_CSS_MIN = re.sub(r"/\*.*?\*/", "", _CSS, flags=re.S)
+_CSS_MIN = re.sub(r"\s+", " ", _CSS_MIN)
+_CSS_MIN = re.sub(r"\s*([{};])\s*", r"\1", _CSS_MIN).strip()
+
+# Injected on every run on purpose: Streamlit drops elements a rerun does not re-emit,
+# so caching this call (or set_page_config above) would leave later reruns unstyled.
+# The expensive part, building _CSS_MIN, already happens once at import.
+st.markdown(_FONT_LINKS + _CSS_MIN, unsafe_allow_html=True)
+
+# Static page sections, rendered once at import (only the user card is per-session)
+_HEADER_HTML = f"""
+<div class="main-header">
+    <h1>🤖 {APP_NAME}</h1>
+    <p>Professional Data Science Platform with MLOps Practices</p>
+    <p class="version">Version {APP_VERSION} | By {APP_AUTHOR}</p>
+</div>
+"""
+
+_CAPABILITIES_HTML = """
+<h2 class="section-header">📊 Platform Capabilities</h2>
+<div class="stats-container">
+    <div class="stats-card">
+        <h2>15+</h2>
+        <p>Preprocessing<br>Techniques</p>
+    </div>
+    <div class="stats-card">
+        <h2>20+</h2>
+        <p>Feature Engineering<br>Operations</p>
+    </div>
+    <div class="stats-card">
+        <h2>10+</h2>
+        <p>Statistical<br>Tests</p>
+    </div>
+    <div class="stats-card">
+        <h2>∞</h2>
+        <p>AI-Powered<br>Insights</p>
+    </div>
+</div>
+<h2 class="section-header">🚀 Key Features</h2>
+<div class="features-grid">
+    <div class="feature-card">
+        <h3>🧹 Advanced Data Cleaning</h3>
+        <p>Comprehensive preprocessing with multiple strategies for handling missing data, outliers, duplicates, and more.</p>
+        <ul>
+            <li>9 missing data handling strategies</li>
+            <li>3 outlier detection methods (IQR, Z-score, Isolation Forest)</li>
+            <li>Automated data type conversion</li>
+            <li>Text cleaning and normalization</li>
+        </ul>
+    </div>
+    <div class="feature-card">
+        <h3>⚙️ Feature Engineering</h3>
+        <p>Advanced feature creation and transformation tools for better model performance.</p>
+        <ul>
+            <li>Polynomial features (degree 2-4)</li>
+            <li>Interaction features (multiply, divide, add, subtract)</li>
+            <li>Mathematical transformations (log, sqrt, power)</li>
+            <li>Date feature extraction (year, month, quarter, weekend)</li>
+            <li>Rolling window features</li>
+        </ul>
+    </div>
+    <div class="feature-card">
+        <h3>📈 Advanced Analytics</h3>
+        <p>Statistical testing and comprehensive analysis capabilities.</p>
+        <ul>
+            <li>T-tests, ANOVA, Chi-square tests</li>
+            <li>Correlation analysis (Pearson, Spearman, Kendall)</li>
+            <li>Normality testing (Shapiro-Wilk)</li>
+            <li>Multicollinearity detection (VIF)</li>
+        </ul>
+    </div>
+    <div class="feature-card">
+        <h3>🤖 AI-Powered Insights</h3>
+        <p>Natural language queries powered by ultra-fast Grok AI models.</p>
+        <ul>
+            <li>Convert questions to SQL automatically</li>
+            <li>Automated insights generation</li>
+            <li>Ultra-fast Grok reasoning engine</li>
+            <li>Multiple AI models available (Grok-4, Grok-2)</li>
+        </ul>
+    </div>
+    <div class="feature-card">
+        <h3>📊 Interactive Visualizations</h3>
+        <p>Auto-generated charts and custom visualizations powered by Plotly.</p>
+        <ul>
+            <li>10+ chart types (histogram, scatter, box, heatmap, etc.)</li>
+            <li>Interactive plots with zoom and hover</li>
+            <li>Correlation heatmaps</li>
+            <li>Distribution analysis</li>
+        </ul>
+    </div>
+    <div class="feature-card">
+        <h3>💾 Data Management</h3>
+        <p>Supabase integration for persistent storage and collaboration.</p>
+        <ul>
+            <li>Save and version datasets in cloud</li>
+            <li>Track complete analysis history</li>
+            <li>Export in 5 formats (CSV, Excel, Parquet, JSON, Feather)</li>
+            <li>Comprehensive audit logging</li>
+        </ul>
+    </div>
+</div>
+"""
+
+_QUICK_START_HTML = """
+<h3>Step 1: Configure API Key</h3>
+<ul>
+    <li>Visit <a href="https://console.x.ai" target="_blank">console.x.ai</a> to get your xAI API key</li>
+    <li>Enter it in the sidebar on any page</li>
+    <li>Select your preferred AI model</li>
+</ul>
+<h3>Step 2: Upload Your Data</h3>
+<ul>
+    <li>Navigate to <strong>📂 Data Upload</strong> page</li>
+    <li>Upload CSV or Excel file (up to 200MB)</li>
+    <li>View data preview and quality metrics</li>
+</ul>
+<h3>Step 3: Clean Your Data</h3>
+<ul>
+    <li>Go to <strong>🧹 Data Cleaning</strong> page</li>
+    <li>Apply preprocessing techniques</li>
+    <li>Handle missing values, outliers, and duplicates</li>
+    <li>Engineer new features</li>
+</ul>
+<h3>Step 4: Analyze &amp; Visualize</h3>
+<ul>
+    <li>Use <strong>📈 Analysis &amp; Insights</strong> for statistical tests</li>
+    <li>Explore <strong>📊 Visualizations</strong> for interactive charts</li>
+    <li>Check <strong>🎛️ Dashboard</strong> for comprehensive overview</li>
+</ul>
+<h3>Step 5: Query with AI</h3>
+<ul>
+    <li>Ask questions in natural language</li>
+    <li>Get instant SQL queries and insights</li>
+    <li>Download results and reports</li>
+</ul>
+"""
+
+_NAVIGATION_HTML = """
+<h2 class="section-header">🧭 Quick Navigation</h2>
+<div class="nav-grid">
+    <div class="info-box">
+        <strong>📂 Data Upload</strong><br>
+        Upload and explore your datasets with quality metrics
+    </div>
+    <div class="info-box">
+        <strong>🧹 Data Cleaning</strong><br>
+        Preprocess and engineer features with 35+ operations
+    </div>
+    <div class="info-box">
+        <strong>📈 Analysis</strong><br>
+        Run statistical tests and get AI-powered insights
+    </div>
+</div>
+"""
+
+_FOOTER_HTML = f"""
+<div class="footer">
+    <h4>🤖 {APP_NAME}</h4>
+    <p>Empowering data-driven decisions with AI and MLOps</p>
+    <p><strong>Developed by {APP_AUTHOR}</strong> | VexaAI © 2025</p>
+    <p style="font-size: 0.9rem; margin-top: 1rem;">Built with ❤️ using Streamlit, Grok AI, Supabase, and Modern MLOps</p>
+</div>
+"""
+
+def _build_user_card_html() -> str:
+    """Build the welcome card HTML from session values, escaping user-supplied text"""
+    username = html.escape(st.session_state.get('username', 'User'))
+    full_name = html.escape(st.session_state.get('user_full_name', '') or '')
+    email = html.escape(st.session_state.get('user_email', '') or '')
+    badge = '<span class="badge">ADMIN</span>' if st.session_state.get('is_admin', False) else ''
+    
+    return f"""
+    <div class="user-info-card">
+        <h3>👋 Welcome back, {full_name if full_name else username}!</h3>
+        <p><span style="font-weight: 600;">👤 Username:</span> {username} {badge}</p>
+        <p><span style="font-weight: 600;">📧 Email:</span> {email}</p>
+    </div>
+    """
 
 def main():
     # Check authentication
@@ -367,218 +576,33 @@ def main():
                 st.success(f"✅ AI Ready: {len(init_result['initialized'])} provider(s) from .env")
 
     # Header
-    st.markdown(f"""
-    <div class="main-header">
-        <h1>🤖 {APP_NAME}</h1>
-        <p>Professional Data Science Platform with MLOps Practices</p>
-        <p class="version">Version {APP_VERSION} | By {APP_AUTHOR}</p>
-    </div>
-    """, unsafe_allow_html=True)
+    st.html(_HEADER_HTML)
     
     # User welcome section
     col1, col2, col3 = st.columns([1, 2, 1])
     with col2:
-        username = st.session_state.get('username', 'User')
-        full_name = st.session_state.get('user_full_name', '')
-        email = st.session_state.get('user_email', '')
         is_admin = st.session_state.get('is_admin', False)
         
-        st.markdown(f"""
-        <div class="user-info-card">
-            <h3>👋 Welcome back, {full_name if full_name else username}!</h3>
-            <p><span style="font-weight: 600;">👤 Username:</span> {username} {'<span class="badge">ADMIN</span>' if is_admin else ''}</p>
-            <p><span style="font-weight: 600;">📧 Email:</span> {email}</p>
-        </div>
-        """, unsafe_allow_html=True)
+        # Built once per session; cleared with the rest of session_state on logout
+        if '_user_card_html' not in st.session_state:
+            st.session_state['_user_card_html'] = _build_user_card_html()
+        st.html(st.session_state['_user_card_html'])
         
         if st.button("🚪 Logout", use_container_width=True, type="primary"):
-            for key in list(st.session_state.keys()):
-                del st.session_state[key]
+            st.session_state.clear()
             st.rerun()
     
-    # Platform statistics
-    st.markdown('<h2 class="section-header">📊 Platform Capabilities</h2>', unsafe_allow_html=True)
-    
-    stat_cols = st.columns(4)
-    
-    with stat_cols[0]:
-        st.markdown("""
-        <div class="stats-card">
-            <h2>15+</h2>
-            <p>Preprocessing<br>Techniques</p>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with stat_cols[1]:
-        st.markdown("""
-        <div class="stats-card">
-            <h2>20+</h2>
-            <p>Feature Engineering<br>Operations</p>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with stat_cols[2]:
-        st.markdown("""
-        <div class="stats-card">
-            <h2>10+</h2>
-            <p>Statistical<br>Tests</p>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with stat_cols[3]:
-        st.markdown("""
-        <div class="stats-card">
-            <h2>∞</h2>
-            <p>AI-Powered<br>Insights</p>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    # Feature showcase
-    st.markdown('<h2 class="section-header">🚀 Key Features</h2>', unsafe_allow_html=True)
-    
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        st.markdown("""
-        <div class="feature-card">
-            <h3>🧹 Advanced Data Cleaning</h3>
-            <p>Comprehensive preprocessing with multiple strategies for handling missing data, outliers, duplicates, and more.</p>
-            <ul>
-                <li>9 missing data handling strategies</li>
-                <li>3 outlier detection methods (IQR, Z-score, Isolation Forest)</li>
-                <li>Automated data type conversion</li>
-                <li>Text cleaning and normalization</li>
-            </ul>
-        </div>
-        """, unsafe_allow_html=True)
-        
-        st.markdown("""
-        <div class="feature-card">
-            <h3>📈 Advanced Analytics</h3>
-            <p>Statistical testing and comprehensive analysis capabilities.</p>
-            <ul>
-                <li>T-tests, ANOVA, Chi-square tests</li>
-                <li>Correlation analysis (Pearson, Spearman, Kendall)</li>
-                <li>Normality testing (Shapiro-Wilk)</li>
-                <li>Multicollinearity detection (VIF)</li>
-            </ul>
-        </div>
-        """, unsafe_allow_html=True)
-        
-        st.markdown("""
-        <div class="feature-card">
-            <h3>📊 Interactive Visualizations</h3>
-            <p>Auto-generated charts and custom visualizations powered by Plotly.</p>
-            <ul>
-                <li>10+ chart types (histogram, scatter, box, heatmap, etc.)</li>
-                <li>Interactive plots with zoom and hover</li>
-                <li>Correlation heatmaps</li>
-                <li>Distribution analysis</li>
-            </ul>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with col2:
-        st.markdown("""
-        <div class="feature-card">
-            <h3>⚙️ Feature Engineering</h3>
-            <p>Advanced feature creation and transformation tools for better model performance.</p>
-            <ul>
-                <li>Polynomial features (degree 2-4)</li>
-                <li>Interaction features (multiply, divide, add, subtract)</li>
-                <li>Mathematical transformations (log, sqrt, power)</li>
-                <li>Date feature extraction (year, month, quarter, weekend)</li>
-                <li>Rolling window features</li>
-            </ul>
-        </div>
-        """, unsafe_allow_html=True)
-        
-        st.markdown("""
-        <div class="feature-card">
-            <h3>🤖 AI-Powered Insights</h3>
-            <p>Natural language queries powered by ultra-fast Grok AI models.</p>
-            <ul>
-                <li>Convert questions to SQL automatically</li>
-                <li>Automated insights generation</li>
-                <li>Ultra-fast Grok reasoning engine</li>
-                <li>Multiple AI models available (Grok-4, Grok-2)</li>
-            </ul>
-        </div>
-        """, unsafe_allow_html=True)
-        
-        st.markdown("""
-        <div class="feature-card">
-            <h3>💾 Data Management</h3>
-            <p>Supabase integration for persistent storage and collaboration.</p>
-            <ul>
-                <li>Save and version datasets in cloud</li>
-                <li>Track complete analysis history</li>
-                <li>Export in 5 formats (CSV, Excel, Parquet, JSON, Feather)</li>
-                <li>Comprehensive audit logging</li>
-            </ul>
-        </div>
-        """, unsafe_allow_html=True)
+    # Platform statistics and feature showcase
+    st.html(_CAPABILITIES_HTML)
     
     # Quick start guide
-    st.markdown('<h2 class="section-header">🎯 Quick Start Guide</h2>', unsafe_allow_html=True)
+    st.html('<h2 class="section-header">🎯 Quick Start Guide</h2>')
     
     with st.expander("📖 How to Get Started", expanded=False):
-        st.markdown("""
-        ### Step 1: Configure API Key
-        - Visit [console.x.ai](https://console.x.ai) to get your xAI API key
-        - Enter it in the sidebar on any page
-        - Select your preferred AI model
-        
-        ### Step 2: Upload Your Data
-        - Navigate to **📂 Data Upload** page
-        - Upload CSV or Excel file (up to 200MB)
-        - View data preview and quality metrics
-        
-        ### Step 3: Clean Your Data
-        - Go to **🧹 Data Cleaning** page
-        - Apply preprocessing techniques
-        - Handle missing values, outliers, and duplicates
-        - Engineer new features
-        
-        ### Step 4: Analyze & Visualize
-        - Use **📈 Analysis & Insights** for statistical tests
-        - Explore **📊 Visualizations** for interactive charts
-        - Check **🎛️ Dashboard** for comprehensive overview
-        
-        ### Step 5: Query with AI
-        - Ask questions in natural language
-        - Get instant SQL queries and insights
-        - Download results and reports
-        """)
+        st.html(_QUICK_START_HTML)
     
     # Navigation tips
-    st.markdown('<h2 class="section-header">🧭 Quick Navigation</h2>', unsafe_allow_html=True)
-    
-    nav_cols = st.columns(3)
-    
-    with nav_cols[0]:
-        st.markdown("""
-        <div class="info-box">
-            <strong>📂 Data Upload</strong><br>
-            Upload and explore your datasets with quality metrics
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with nav_cols[1]:
-        st.markdown("""
-        <div class="info-box">
-            <strong>🧹 Data Cleaning</strong><br>
-            Preprocess and engineer features with 35+ operations
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with nav_cols[2]:
-        st.markdown("""
-        <div class="info-box">
-            <strong>📈 Analysis</strong><br>
-            Run statistical tests and get AI-powered insights
-        </div>
-        """, unsafe_allow_html=True)
+    st.html(_NAVIGATION_HTML)
     
     # Admin panel link
     if is_admin:
@@ -586,14 +610,7 @@ def main():
         st.info("🔑 **Admin Access Granted** - You have additional privileges for user management and system administration")
     
     # Footer
-    st.markdown(f"""
-    <div class="footer">
-        <h4>🤖 {APP_NAME}</h4>
-        <p>Empowering data-driven decisions with AI and MLOps</p>
-        <p><strong>Developed by {APP_AUTHOR}</strong> | VexaAI © 2025</p>
-        <p style="font-size: 0.9rem; margin-top: 1rem;">Built with ❤️ using Streamlit, Grok AI, Supabase, and Modern MLOps</p>
-    </div>
-    """, unsafe_allow_html=True)
+    st.html(_FOOTER_HTML)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -5,25 +5,40 @@ VexaAI Backend API - FastAPI Wrapper
 Connects Next.js frontend to existing Python backend
 """
 
-from fastapi import FastAPI, HTTPException, Depends, UploadFile, File, Form
+from fastapi import FastAPI, HTTPException, Depends, UploadFile, File, Form, Request, Response
+from fastapi.concurrency import iterate_in_threadpool, run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from pydantic import BaseModel
 from typing import Optional, List, Dict, Any
+import numpy as np
 import pandas as pd
 import sys
 from pathlib import Path
 import jwt
+import asyncio
+import json
+import hashlib
 import os
-from datetime import datetime, timedelta
-import tempfile
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from core.auth import SupabaseAuthManager
-from core.ml_engine import preprocess_and_save, generate_sql_query, execute_query, interpret_results
-from core.ai_client import get_unified_client
+from core.auth import get_auth_manager
+from core.ml_engine import (
+    preprocess_and_save, generate_sql_query, execute_query, interpret_results, stream_interpretation
+)
+from core.ai_client import UnifiedAIClient, get_unified_client
 from core.data_analysis import DataAnalyzer
 from database.supabase_manager import get_supabase_manager
 from utils.logger import get_logger, audit_logger
@@ -46,11 +61,19 @@ security = HTTPBearer()
 # JWT Configuration
 JWT_SECRET = os.getenv("JWT_SECRET", "your-super-secret-key-change-in-production")
 JWT_ALGORITHM = "HS256"
+TOKEN_CACHE_MAX_SIZE = 10000
+
+# Response Cache Configuration (dataset listing / details polled by the dashboard)
+RESPONSE_CACHE_TTL_SECONDS = 30
+RESPONSE_CACHE_MAX_SIZE = 1024
 
 # Initialize managers
-auth_manager = SupabaseAuthManager()
+auth_manager = get_auth_manager()
 db_manager = get_supabase_manager()
 
+# Serializes provider (re)configuration on the shared AI client
+ai_config_lock = asyncio.Lock()
+
 # ==================== MODELS ====================
 
 class LoginRequest(BaseModel):
@@ -79,20 +102,118 @@ def create_token(username: str, is_admin: bool = False) -> str:
     payload = {
         "username": username,
         "is_admin": is_admin,
-        "exp": datetime.utcnow() + timedelta(days=7)
+        "exp": datetime.now(timezone.utc) + timedelta(days=7)
     }
     return jwt.encode(payload, JWT_SECRET, algorithm=JWT_ALGORITHM)
 
+# Decoded-token LRU cache keyed by token digest; entries are only served until the token's exp
+_token_cache: "OrderedDict[bytes, Dict]" = OrderedDict()
+_token_cache_lock = threading.Lock()
+
 def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)) -> Dict:
-    """Verify JWT token"""
+    """Verify JWT token (cached per token until it expires)"""
+    token = credentials.credentials
+    cache_key = hashlib.blake2b(token.encode(), digest_size=16).digest()
+    
+    with _token_cache_lock:
+        payload = _token_cache.get(cache_key)
+        if payload is not None:
+            if payload["exp"] > time.time():
+                _token_cache.move_to_end(cache_key)
+                return payload
+            del _token_cache[cache_key]
+    
     try:
-        token = credentials.credentials
         payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
-        return payload
     except jwt.ExpiredSignatureError:
         raise HTTPException(status_code=401, detail="Token expired")
     except jwt.InvalidTokenError:
         raise HTTPException(status_code=401, detail="Invalid token")
+    
+    with _token_cache_lock:
+        _token_cache[cache_key] = payload
+        if len(_token_cache) > TOKEN_CACHE_MAX_SIZE:
+            _token_cache.popitem(last=False)
+    
+    return payload
+
+# ==================== RESPONSE HELPERS ====================
+
+def dataframe_response(payload: Dict[str, Any], records_key: str, df: pd.DataFrame) -> Response:
+    """Build a JSON response with DataFrame rows under records_key"""
+    return Response(content=dataframe_json(payload, records_key, df), media_type="application/json")
+
+def _json_default(obj: Any) -> Any:
+    """Encode the pandas/numpy scalars that to_dict('records') leaves in rows"""
+    if obj is pd.NaT:
+        return None
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    return str(obj)
+
+def dataframe_json(payload: Dict[str, Any], records_key: str, df: pd.DataFrame) -> str:
+    """
+    Serialize payload plus DataFrame rows under records_key as a JSON object string.
+    Floats keep full precision (pandas' to_json rounds to at most 15 digits); NaN/NaT become null.
+    """
+    body = dict(payload)
+    if orjson is not None:
+        # orjson writes NaN as null and numpy scalars natively, in C
+        body[records_key] = df.to_dict("records")
+        return orjson.dumps(
+            body, default=_json_default,
+            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        ).decode()
+    
+    body[records_key] = df.astype(object).where(df.notna(), None).to_dict("records")
+    return json.dumps(body, default=_json_default)
+
+def sse_event(event: str, data: str) -> str:
+    """Format a single Server-Sent Event frame from a JSON string"""
+    return f"event: {event}\ndata: {data}\n\n"
+
+# ==================== RESPONSE CACHE ====================
+
+# (username, endpoint, *args) -> (stored_at, body, etag)
+_response_cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+_response_cache_lock = threading.Lock()
+
+def cache_get(key: tuple) -> Optional[tuple]:
+    """Return (body, etag) for a fresh cache entry, or None"""
+    with _response_cache_lock:
+        entry = _response_cache.get(key)
+        if entry is None:
+            return None
+        stored_at, body, etag = entry
+        if time.monotonic() - stored_at > RESPONSE_CACHE_TTL_SECONDS:
+            del _response_cache[key]
+            return None
+        _response_cache.move_to_end(key)
+        return body, etag
+
+def cache_put(key: tuple, body: bytes) -> str:
+    """Store a response body and return its ETag"""
+    etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+    with _response_cache_lock:
+        _response_cache[key] = (time.monotonic(), body, etag)
+        if len(_response_cache) > RESPONSE_CACHE_MAX_SIZE:
+            _response_cache.popitem(last=False)
+    return etag
+
+def cache_invalidate_user(username: str):
+    """Drop all cached responses belonging to a user"""
+    with _response_cache_lock:
+        for key in [k for k in _response_cache if k[0] == username]:
+            del _response_cache[key]
+
+def cached_response(request: Request, body: bytes, etag: str) -> Response:
+    """Serve a cached body, or 304 Not Modified when the client already has it"""
+    headers = {"ETag": etag, "Cache-Control": f"private, max-age={RESPONSE_CACHE_TTL_SECONDS}"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 # ==================== AUTH ENDPOINTS ====================
 
@@ -100,19 +221,21 @@ def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security))
 async def login(request: LoginRequest):
     """Login endpoint"""
     try:
-        success, message = auth_manager.verify_credentials(request.username, request.password)
+        # Supabase round trip + password KDF: keep it off the event loop
+        success, message, user = await run_in_threadpool(
+            auth_manager.authenticate_user, request.username, request.password
+        )
         
         if success:
-            user = auth_manager.get_user(request.username)
-            is_admin = user.get('role') == 'admin' if user else False
+            is_admin = user.get('role') == 'admin'
             
-            token = create_token(request.username, is_admin)
+            token = create_token(user['username'], is_admin)
             
             return {
                 "success": True,
                 "token": token,
                 "user": {
-                    "username": request.username,
+                    "username": user['username'],
                     "email": user.get('email'),
                     "full_name": user.get('full_name'),
                     "is_admin": is_admin
@@ -129,7 +252,8 @@ async def login(request: LoginRequest):
 async def register(request: RegisterRequest):
     """Register endpoint"""
     try:
-        success, message = auth_manager.register_user(
+        success, message = await run_in_threadpool(
+            auth_manager.register_user,
             request.username,
             request.email,
             request.password,
@@ -149,7 +273,7 @@ async def register(request: RegisterRequest):
 async def get_current_user(payload: Dict = Depends(verify_token)):
     """Get current user info"""
     try:
-        user = auth_manager.get_user(payload['username'])
+        user = await run_in_threadpool(auth_manager.get_user_by_username, payload['username'])
         return {
             "username": payload['username'],
             "email": user.get('email'),
@@ -169,101 +293,119 @@ async def upload_data(
 ):
     """Upload dataset"""
     try:
-        # Save uploaded file temporarily
-        with tempfile.NamedTemporaryFile(delete=False, suffix=f".{file.filename.split('.')[-1]}") as tmp:
-            content = await file.read()
-            tmp.write(content)
-            tmp_path = tmp.name
-        
-        # Process file
-        class TempFile:
-            def __init__(self, path, filename):
-                self.name = filename
-                self._path = path
-            def seek(self, pos):
-                pass
+        # Parse straight from the upload's spooled file (no temp-file copy)
+        df = await run_in_threadpool(preprocess_and_save, file.file, file.filename)
         
-        temp_file = TempFile(tmp_path, file.filename)
-        df = preprocess_and_save(temp_file)
+        # Column metadata never changes after upload, so store it once here
+        # (jsonb does not keep key order, hence the separate column_names list)
+        column_names = df.columns.tolist()
+        column_info = {col: str(dtype) for col, dtype in df.dtypes.items()}
         
         # Save to Supabase
-        success = db_manager.save_dataset(
+        dataset_id = await run_in_threadpool(
+            db_manager.save_dataset,
             user_id=payload['username'],
             dataset_name=dataset_name,
-            dataframe=df,
-            file_path=tmp_path
+            file_name=file.filename,
+            file_size=file.size or 0,
+            rows=len(df),
+            columns=len(column_names),
+            column_info=column_info,
+            metadata={"column_names": column_names}
         )
         
-        if success:
-            datasets = db_manager.get_user_datasets(payload['username'])
-            latest = datasets[0] if datasets else None
+        if dataset_id:
+            stored = await run_in_threadpool(db_manager.save_dataset_frame, dataset_id, df)
+            if not stored:
+                await run_in_threadpool(db_manager.delete_dataset, dataset_id)
+                raise HTTPException(status_code=500, detail="Failed to store dataset data")
+            
+            cache_invalidate_user(payload['username'])
             
             return {
                 "success": True,
                 "message": "Dataset uploaded successfully",
                 "dataset": {
-                    "id": latest['id'],
-                    "name": latest['dataset_name'],
-                    "rows": latest['row_count'],
-                    "columns": latest['column_count']
+                    "id": dataset_id,
+                    "name": dataset_name,
+                    "rows": len(df),
+                    "columns": len(column_names)
                 }
             }
         else:
             raise HTTPException(status_code=500, detail="Failed to save dataset")
             
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Upload error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        # Cleanup
-        if 'tmp_path' in locals():
-            os.unlink(tmp_path)
 
 # ==================== DATASETS ====================
 
 @app.get("/api/data/datasets")
-async def get_datasets(payload: Dict = Depends(verify_token)):
+async def get_datasets(http_request: Request, payload: Dict = Depends(verify_token)):
     """Get user datasets"""
     try:
-        datasets = db_manager.get_user_datasets(payload['username'])
-        return {"datasets": datasets}
+        cache_key = (payload['username'], "datasets")
+        cached = cache_get(cache_key)
+        if cached is None:
+            datasets = await run_in_threadpool(db_manager.get_user_datasets, payload['username'])
+            body = json.dumps({"datasets": datasets}).encode()
+            cached = body, cache_put(cache_key, body)
+        
+        return cached_response(http_request, *cached)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/data/dataset/{dataset_id}")
-async def get_dataset(dataset_id: str, payload: Dict = Depends(verify_token)):
+async def get_dataset(dataset_id: str, http_request: Request, payload: Dict = Depends(verify_token)):
     """Get dataset details"""
     try:
-        df = db_manager.load_dataset(dataset_id)
+        cache_key = (payload['username'], "dataset", dataset_id)
+        cached = cache_get(cache_key)
+        if cached is not None:
+            return cached_response(http_request, *cached)
         
-        if df is None:
+        dataset = await run_in_threadpool(db_manager.get_dataset_by_id, dataset_id)
+        if dataset is None:
             raise HTTPException(status_code=404, detail="Dataset not found")
         
-        # Get basic info
+        # Basic info comes from the metadata stored at upload time
+        column_info = dataset.get('column_info') or {}
         info = {
-            "rows": len(df),
-            "columns": len(df.columns),
-            "column_names": df.columns.tolist(),
-            "dtypes": df.dtypes.astype(str).to_dict(),
-            "preview": df.head(10).to_dict('records')
+            "rows": dataset.get('rows'),
+            "columns": dataset.get('columns'),
+            "column_names": (dataset.get('metadata') or {}).get('column_names', list(column_info)),
+            "dtypes": column_info
         }
         
-        return info
+        # Uploads from before frames were stored have metadata but no rows to preview
+        df = await run_in_threadpool(db_manager.load_dataset, dataset_id)
+        preview = df.head(10) if df is not None else pd.DataFrame()
         
+        body = dataframe_json(info, "preview", preview).encode()
+        return cached_response(http_request, body, cache_put(cache_key, body))
+        
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 # ==================== AI CONFIGURATION ====================
 
 @app.post("/api/ai/configure")
-async def configure_ai(request: AIConfigRequest, payload: Dict = Depends(verify_token)):
+async def configure_ai(
+    request: AIConfigRequest,
+    payload: Dict = Depends(verify_token),
+    client: UnifiedAIClient = Depends(get_unified_client)
+):
     """Configure AI provider"""
     try:
-        client = get_unified_client()
-        
-        # Add client
-        client.add_client(request.provider, request.api_key)
-        client.set_active_provider(request.provider, request.model)
+        async with ai_config_lock:
+            # Add client
+            await run_in_threadpool(client.add_client, request.provider, request.api_key)
+            client.set_active_provider(request.provider, request.model)
         
         return {
             "success": True,
@@ -278,19 +420,21 @@ async def configure_ai(request: AIConfigRequest, payload: Dict = Depends(verify_
 # ==================== AI QUERIES ====================
 
 @app.post("/api/ai/query")
-async def ai_query(request: AIQueryRequest, payload: Dict = Depends(verify_token)):
+async def ai_query(
+    request: AIQueryRequest,
+    payload: Dict = Depends(verify_token),
+    client: UnifiedAIClient = Depends(get_unified_client)
+):
     """Process AI query"""
     try:
         # Load dataset
-        df = db_manager.load_dataset(request.dataset_id)
+        df = await run_in_threadpool(db_manager.load_dataset, request.dataset_id)
         if df is None:
             raise HTTPException(status_code=404, detail="Dataset not found")
         
-        # Get AI client
-        client = get_unified_client()
-        
         # Generate SQL
-        sql_query = generate_sql_query(
+        sql_query = await run_in_threadpool(
+            generate_sql_query,
             request.query,
             df.columns.tolist(),
             "data",
@@ -298,10 +442,11 @@ async def ai_query(request: AIQueryRequest, payload: Dict = Depends(verify_token
         )
         
         # Execute query
-        results = execute_query(df, sql_query)
+        results = await run_in_threadpool(execute_query, df, sql_query)
         
         # Interpret results
-        interpretation = interpret_results(
+        interpretation = await run_in_threadpool(
+            interpret_results,
             request.query,
             sql_query,
             results,
@@ -315,19 +460,70 @@ async def ai_query(request: AIQueryRequest, payload: Dict = Depends(verify_token
             f"Query: {request.query}"
         )
         
-        return {
+        return dataframe_response({
             "success": True,
             "sql": sql_query,
-            "results": results.to_dict('records'),
             "interpretation": interpretation,
             "rows": len(results),
             "columns": len(results.columns)
-        }
+        }, "results", results)
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Query error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/api/ai/query/stream")
+async def ai_query_stream(
+    request: AIQueryRequest,
+    payload: Dict = Depends(verify_token),
+    client: UnifiedAIClient = Depends(get_unified_client)
+):
+    """Process AI query, streaming SQL, results and interpretation as they complete
+    The interpretation arrives as interpretation_delta events, then once in full"""
+    df = await run_in_threadpool(db_manager.load_dataset, request.dataset_id)
+    if df is None:
+        raise HTTPException(status_code=404, detail="Dataset not found")
+    
+    async def stages():
+        try:
+            sql_query = await run_in_threadpool(
+                generate_sql_query,
+                request.query,
+                df.columns.tolist(),
+                "data",
+                client
+            )
+            yield sse_event("sql", json.dumps({"sql": sql_query}))
+            
+            results = await run_in_threadpool(execute_query, df, sql_query)
+            yield sse_event("results", dataframe_json({
+                "rows": len(results),
+                "columns": len(results.columns)
+            }, "results", results))
+            
+            parts = []
+            async for chunk in iterate_in_threadpool(
+                stream_interpretation(request.query, sql_query, results, client)
+            ):
+                parts.append(chunk)
+                yield sse_event("interpretation_delta", json.dumps({"text": chunk}))
+            yield sse_event("interpretation", json.dumps({"interpretation": "".join(parts).strip()}))
+            
+            audit_logger.log_user_action(
+                payload['username'],
+                "ai_query",
+                f"Query: {request.query}"
+            )
+            yield sse_event("done", json.dumps({"success": True}))
+            
+        except Exception as e:
+            logger.error(f"Query stream error: {e}")
+            yield sse_event("error", json.dumps({"detail": str(e)}))
+    
+    return StreamingResponse(stages(), media_type="text/event-stream")
+
 # ==================== STATISTICS ====================
 
 @app.post("/api/stats/ttest")
@@ -339,15 +535,17 @@ async def perform_ttest(
 ):
     """Perform T-test"""
     try:
-        df = db_manager.load_dataset(dataset_id)
+        df = await run_in_threadpool(db_manager.load_dataset, dataset_id)
         if df is None:
             raise HTTPException(status_code=404, detail="Dataset not found")
         
         analyzer = DataAnalyzer(df)
-        result = analyzer.perform_t_test(column, group_column)
+        result = await run_in_threadpool(analyzer.perform_t_test, column, group_column)
         
         return result
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -360,7 +558,7 @@ async def get_all_users(payload: Dict = Depends(verify_token)):
         raise HTTPException(status_code=403, detail="Admin access required")
     
     try:
-        users = auth_manager.get_all_users()
+        users = await run_in_threadpool(auth_manager.get_all_users)
         return {"users": users}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -372,7 +570,7 @@ async def health_check():
     """Health check endpoint"""
     return {
         "status": "healthy",
-        "timestamp": datetime.utcnow().isoformat(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
         "database": "connected" if db_manager.is_connected() else "disconnected"
     }
 
@@ -4,14 +4,19 @@ Auto-loads API keys from .env and initializes providers
 """
 
 import os
-from dotenv import load_dotenv
 from core.ai_client import get_unified_client
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
-# Load environment variables
-load_dotenv()
+# Environment variables are loaded once by config.settings (imported via utils.logger)
+
+# (provider, environment variable, display name)
+PROVIDER_ENV_KEYS = (
+    ("xai", "XAI_API_KEY", "xAI"),
+    ("groq", "GROQ_API_KEY", "Groq"),
+    ("gemini", "GEMINI_API_KEY", "Gemini"),
+)
 
 
 def initialize_ai_from_env():
@@ -23,41 +28,19 @@ def initialize_ai_from_env():
     initialized_providers = []
     errors = []
     
-    # xAI / Grok
-    xai_key = os.getenv("XAI_API_KEY")
-    if xai_key and xai_key.strip():
-        try:
-            if "xai" not in unified_client.get_available_providers():
-                unified_client.add_client("xai", xai_key)
-                logger.info("✅ xAI initialized from .env")
-                initialized_providers.append("xai")
-        except Exception as e:
-            logger.warning(f"Failed to initialize xAI from .env: {e}")
-            errors.append(("xai", str(e)))
-    
-    # Groq
-    groq_key = os.getenv("GROQ_API_KEY")
-    if groq_key and groq_key.strip():
-        try:
-            if "groq" not in unified_client.get_available_providers():
-                unified_client.add_client("groq", groq_key)
-                logger.info("✅ Groq initialized from .env")
-                initialized_providers.append("groq")
-        except Exception as e:
-            logger.warning(f"Failed to initialize Groq from .env: {e}")
-            errors.append(("groq", str(e)))
+    available = set(unified_client.get_available_providers())
     
-    # Gemini
-    gemini_key = os.getenv("GEMINI_API_KEY")
-    if gemini_key and gemini_key.strip():
+    for provider, env_var, display_name in PROVIDER_ENV_KEYS:
+        api_key = os.getenv(env_var, "").strip()
+        if not api_key or provider in available:
+            continue
         try:
-            if "gemini" not in unified_client.get_available_providers():
-                unified_client.add_client("gemini", gemini_key)
-                logger.info("✅ Gemini initialized from .env")
-                initialized_providers.append("gemini")
+            unified_client.add_client(provider, api_key)
+            logger.info(f"✅ {display_name} initialized from .env")
+            initialized_providers.append(provider)
         except Exception as e:
-            logger.warning(f"Failed to initialize Gemini from .env: {e}")
-            errors.append(("gemini", str(e)))
+            logger.warning(f"Failed to initialize {display_name} from .env: {e}")
+            errors.append((provider, str(e)))
     
     # Set default provider if specified
     if initialized_providers:
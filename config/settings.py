@@ -6,8 +6,10 @@ Works both locally (.env) and on Streamlit Cloud (secrets)
 
 import os
 import streamlit as st
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Any
+from types import MappingProxyType
+from typing import Any, Mapping
 from dotenv import load_dotenv
 
 # Load environment variables from .env file (for local development)
@@ -18,11 +20,9 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 LOGS_DIR = BASE_DIR / "logs"
 DATA_DIR = BASE_DIR / "data"
 TEMP_DIR = BASE_DIR / "temp"
+DATASET_STORE_DIR = DATA_DIR / "datasets"  # Uploaded frames, one parquet file per dataset id
 
-# Create directories if they don't exist
-LOGS_DIR.mkdir(exist_ok=True)
-DATA_DIR.mkdir(exist_ok=True)
-TEMP_DIR.mkdir(exist_ok=True)
+# Directories are created by the code that writes to them (logger, caches)
 
 # Application settings
 APP_NAME = "VexaAI Data Analyst Pro"
@@ -31,14 +31,18 @@ APP_AUTHOR = "John Evans Okyere"
 APP_COMPANY = "VexaAI"
 
 # ==================== HELPER FUNCTION FOR SECRETS ====================
+_HAS_ST_SECRETS = hasattr(st, 'secrets')
+
+@lru_cache(maxsize=None)
 def get_secret(key: str, default: str = "") -> str:
     """
     Get secret from Streamlit secrets (cloud) or environment variables (local)
     This allows the app to work in both environments seamlessly
+    Each key is resolved once per process
     """
     try:
         # Try Streamlit secrets first (for cloud deployment)
-        if hasattr(st, 'secrets') and key in st.secrets:
+        if _HAS_ST_SECRETS and key in st.secrets:
             return st.secrets[key]
     except Exception:
         pass
@@ -50,6 +54,11 @@ def get_secret(key: str, default: str = "") -> str:
 SUPABASE_URL = get_secret("SUPABASE_URL", "")
 SUPABASE_KEY = get_secret("SUPABASE_ANON_KEY", "")
 SUPABASE_SERVICE_ROLE_KEY = get_secret("SUPABASE_SERVICE_ROLE_KEY", "")
+SUPABASE_MAX_CONNECTIONS = 20  # Per client, shared by every Streamlit session in the process
+SUPABASE_MAX_KEEPALIVE_CONNECTIONS = 10
+SUPABASE_KEEPALIVE_EXPIRY_SECONDS = 30
+SUPABASE_TIMEOUT_SECONDS = 120  # supabase-py's own PostgREST default
+SUPABASE_CONNECT_RETRIES = 2
 
 
 # AI Model API Keys
@@ -61,29 +70,30 @@ GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "")
 AI_PROVIDERS = {
     "xai": {
         "name": "xAI Grok",
-        "models": ["grok-2-1212", "grok-2-vision-1212", "grok-beta"],
+        "models": ("grok-2-1212", "grok-2-vision-1212", "grok-beta"),
         "default_model": "grok-2-1212"
     },
     "groq": {
         "name": "Groq",
-        "models": ["llama-3.3-70b-versatile", "llama-3.1-70b-versatile", "mixtral-8x7b-32768"],
+        "models": ("llama-3.3-70b-versatile", "llama-3.1-70b-versatile", "mixtral-8x7b-32768"),
         "default_model": "llama-3.3-70b-versatile"
     },
     "gemini": {
         "name": "Google Gemini",
-        "models": ["gemini-1.5-flash", "gemini-1.5-pro", "gemini-pro"],
+        "models": ("gemini-1.5-flash", "gemini-1.5-pro", "gemini-pro"),
         "default_model": "gemini-1.5-flash"
     }
 }
 
 # Data Processing Configuration
 MAX_FILE_SIZE_MB = 200
-SUPPORTED_FILE_TYPES = ["csv", "xlsx", "xls"]
+SUPPORTED_FILE_TYPES = ("csv", "xlsx", "xls")
 MAX_ROWS_PREVIEW = 10
 MAX_COLUMNS_DISPLAY = 50
 
+# Option lists are tuples so shared config can't be mutated by callers
 # Data Cleaning Configuration
-MISSING_VALUE_STRATEGIES = [
+MISSING_VALUE_STRATEGIES = (
     "drop_rows",
     "drop_columns",
     "fill_mean",
@@ -93,43 +103,43 @@ MISSING_VALUE_STRATEGIES = [
     "forward_fill",
     "backward_fill",
     "interpolate"
-]
+)
 
-OUTLIER_DETECTION_METHODS = [
+OUTLIER_DETECTION_METHODS = (
     "iqr",
     "z_score",
     "isolation_forest",
     "modified_z_score"
-]
+)
 
-ENCODING_METHODS = [
+ENCODING_METHODS = (
     "label_encoding",
     "one_hot_encoding",
     "ordinal_encoding",
     "target_encoding",
     "frequency_encoding"
-]
+)
 
-SCALING_METHODS = [
+SCALING_METHODS = (
     "standard_scaler",
     "min_max_scaler",
     "robust_scaler",
     "max_abs_scaler",
     "normalizer"
-]
+)
 
 # Feature Engineering Configuration
-FEATURE_ENGINEERING_OPERATIONS = [
+FEATURE_ENGINEERING_OPERATIONS = (
     "polynomial_features",
     "interaction_features",
     "log_transform",
     "sqrt_transform",
     "binning",
     "date_features"
-]
+)
 
 # Visualization Configuration
-CHART_TYPES = [
+CHART_TYPES = (
     "histogram",
     "scatter",
     "line",
@@ -140,16 +150,16 @@ CHART_TYPES = [
     "correlation",
     "pie",
     "area"
-]
+)
 
 PLOT_THEME = "plotly_white"
 COLOR_SCHEMES = {
-    "primary": ["#667eea", "#764ba2"],
-    "secondary": ["#f093fb", "#f5576c"],
-    "success": ["#4facfe", "#00f2fe"],
-    "info": ["#43e97b", "#38f9d7"],
-    "warning": ["#fa709a", "#fee140"],
-    "danger": ["#ff0844", "#ffb199"]
+    "primary": ("#667eea", "#764ba2"),
+    "secondary": ("#f093fb", "#f5576c"),
+    "success": ("#4facfe", "#00f2fe"),
+    "info": ("#43e97b", "#38f9d7"),
+    "warning": ("#fa709a", "#fee140"),
+    "danger": ("#ff0844", "#ffb199")
 }
 
 # MLOps Configuration
@@ -174,23 +184,23 @@ SESSION_TIMEOUT_MINUTES = 60
 MAX_CONCURRENT_SESSIONS = 100
 
 # Export Configuration
-EXPORT_FORMATS = ["csv", "excel", "parquet", "json", "feather"]
-EXPORT_COMPRESSION = ["none", "gzip", "bz2", "zip", "xz"]
+EXPORT_FORMATS = ("csv", "excel", "parquet", "json", "feather")
+EXPORT_COMPRESSION = ("none", "gzip", "bz2", "zip", "xz")
 
 # Statistics Configuration
-STATISTICAL_TESTS = [
+STATISTICAL_TESTS = (
     "t_test",
     "anova",
     "chi_square",
     "correlation_test",
     "normality_test",
     "variance_test"
-]
+)
 
 # AutoML Configuration
 AUTOML_ENABLED = True
 AUTOML_MAX_TIME_MINUTES = 10
-AUTOML_METRIC_OPTIONS = [
+AUTOML_METRIC_OPTIONS = (
     "accuracy",
     "precision",
     "recall",
@@ -199,11 +209,13 @@ AUTOML_METRIC_OPTIONS = [
     "rmse",
     "mae",
     "r2"
-]
+)
 
 # Cache Configuration
 CACHE_TTL_SECONDS = 3600  # 1 hour
 ENABLE_CACHING = True
+LLM_CACHE_FILE = TEMP_DIR / "llm_cache.sqlite3"
+LLM_CACHE_MAX_TEMPERATURE = 0.3  # Don't cache more creative completions
 
 # Security Configuration
 PASSWORD_MIN_LENGTH = 8
@@ -214,8 +226,11 @@ SESSION_COOKIE_SECURE = True
 
 # API Configuration
 API_TIMEOUT_SECONDS = 30
-API_MAX_RETRIES = 3
+API_MAX_RETRIES = 3  # Retries on 429/5xx responses
+API_CONNECT_RETRIES = 2  # Retries when a connection could not be opened (request never sent)
 API_RETRY_DELAY_SECONDS = 1
+CIRCUIT_BREAKER_FAILURE_THRESHOLD = 3  # Consecutive failures before a provider is skipped
+CIRCUIT_BREAKER_COOLDOWN_SECONDS = 60
 
 # Monitoring Configuration
 ENABLE_PERFORMANCE_MONITORING = True
@@ -255,9 +270,13 @@ FEATURES = {
     "real_time_processing": False  # Coming soon
 }
 
-def get_config() -> Dict[str, Any]:
-    """Get all configuration as dictionary"""
-    return {
+_FEATURES_VIEW = MappingProxyType(FEATURES)
+_ENABLED_FEATURES = frozenset(name for name, enabled in FEATURES.items() if enabled)
+
+@lru_cache(maxsize=1)
+def get_config() -> Mapping[str, Any]:
+    """Get all configuration as a read-only mapping (built once per process)"""
+    config = {
         "app": {
             "name": APP_NAME,
             "version": APP_VERSION,
@@ -269,18 +288,18 @@ def get_config() -> Dict[str, Any]:
             "key": SUPABASE_KEY,
             "service_role_key": SUPABASE_SERVICE_ROLE_KEY
         },
-        "xai": {
-            "base_url": XAI_BASE_URL,
-            "models": XAI_MODELS,
-            "default_model": DEFAULT_XAI_MODEL
-        },
+        "ai_providers": AI_PROVIDERS,
         "data_processing": {
             "max_file_size_mb": MAX_FILE_SIZE_MB,
             "supported_file_types": SUPPORTED_FILE_TYPES
         },
-        "features": FEATURES
+        "features": _FEATURES_VIEW
     }
+    return MappingProxyType({
+        section: values if isinstance(values, MappingProxyType) else MappingProxyType(values)
+        for section, values in config.items()
+    })
 
 def is_feature_enabled(feature_name: str) -> bool:
     """Check if a feature is enabled"""
-    return FEATURES.get(feature_name, False)
\ No newline at end of file
+    return feature_name in _ENABLED_FEATURES
@@ -3,44 +3,204 @@ VexaAI Data Analyst - Multi-Model AI Client
 Supports: xAI Grok, Groq, Google Gemini
 """
 
+import hashlib
+import json
+import sqlite3
+import threading
+import time
 import requests
-from typing import Dict, List, Optional
+from pathlib import Path
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
+from typing import Dict, Iterator, List, Optional, Tuple
 from abc import ABC, abstractmethod
+from config.settings import (
+    API_TIMEOUT_SECONDS,
+    API_MAX_RETRIES,
+    API_CONNECT_RETRIES,
+    API_RETRY_DELAY_SECONDS,
+    CACHE_TTL_SECONDS,
+    CIRCUIT_BREAKER_FAILURE_THRESHOLD,
+    CIRCUIT_BREAKER_COOLDOWN_SECONDS,
+    ENABLE_CACHING,
+    LLM_CACHE_FILE,
+    LLM_CACHE_MAX_TEMPERATURE
+)
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# orjson is optional; it encodes straight to bytes and parses faster than stdlib json
+try:
+    import orjson
+    json_dumps = orjson.dumps
+    json_loads = orjson.loads
+except ImportError:
+    def json_dumps(obj) -> bytes:
+        return json.dumps(obj).encode()
+    json_loads = json.loads
+
+
+class AIProviderError(Exception):
+    """A request to an AI provider failed"""
+    
+    def __init__(self, provider: str, orig: Exception, message: str = "API error"):
+        super().__init__(f"{provider} {message}: {orig}")
+        self.provider = provider
+        self.orig = orig
+
+
+class AllProvidersFailedError(AIProviderError):
+    """Neither the active provider nor any fallback produced a response"""
+    
+    def __init__(self, provider: str, orig: Optional[Exception] = None):
+        super().__init__(provider, orig or "circuit open after repeated failures",
+                         "and every fallback provider failed")
+        self.orig = orig
+
+
+def create_session(headers: Dict[str, str]) -> requests.Session:
+    """Create a keep-alive HTTP session with connection pooling and retries"""
+    session = requests.Session()
+    session.headers.update(headers)
+    
+    # Completion POSTs are billed and not idempotent: only retry when the request
+    # was never sent (connect) or the provider answered with a retryable status.
+    # read=0 keeps a hung provider to one timeout, so fallbacks/breaker react quickly.
+    retry = Retry(
+        total=None,
+        connect=API_CONNECT_RETRIES,
+        read=0,
+        other=0,
+        status=API_MAX_RETRIES,
+        backoff_factor=API_RETRY_DELAY_SECONDS,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=frozenset(["GET", "POST"])
+    )
+    session.mount("https://", HTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=retry))
+    return session
+
+
+def iter_sse_data(response: requests.Response) -> Iterator[Dict]:
+    """Yield parsed JSON payloads from a streamed Server-Sent Events response"""
+    for line in response.iter_lines():
+        if not line.startswith(b"data:"):
+            continue
+        payload = line[5:].strip()
+        if payload == b"[DONE]":
+            break
+        yield json_loads(payload)
+
+
+class LLMResponseCache:
+    """
+    Persistent exact-match cache for chat completions
+    Keyed by a hash of (model, messages, max_tokens, temperature), stored in SQLite
+    """
+    
+    def __init__(self, path=LLM_CACHE_FILE, ttl_seconds: int = CACHE_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses "
+            "(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+    
+    @staticmethod
+    def make_key(model: str, messages: List[Dict], max_tokens: int, temperature: float) -> str:
+        """Build a content-addressed key for a completion request"""
+        # Whitespace-only differences in a prompt map to the same entry
+        normalized = [
+            {**msg, "content": " ".join(str(msg.get("content", "")).split())}
+            for msg in messages
+        ]
+        request = json.dumps(
+            {"m": model, "t": temperature, "mt": max_tokens, "msgs": normalized},
+            sort_keys=True
+        )
+        return hashlib.blake2b(request.encode(), digest_size=32).hexdigest()
+    
+    def get(self, key: str) -> Optional[Dict]:
+        """Return a cached completion, or None if missing or expired"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM responses WHERE key = ? AND expires_at > ?",
+                (key, time.time())
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+    
+    def set(self, key: str, value: Dict):
+        """Store a completion until the TTL expires"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value), time.time() + self.ttl_seconds)
+            )
+            self._conn.commit()
+
 
 class BaseAIClient(ABC):
     """Base class for all AI clients"""
     
+    # Supported models, first entry is the default
+    MODELS: Tuple[str, ...] = ()
+    
     @abstractmethod
     def chat_completion(self, messages: List[Dict], **kwargs) -> Dict:
         """Generate chat completion"""
         pass
     
+    @abstractmethod
+    def stream_chat_completion(self, messages: List[Dict], **kwargs) -> Iterator[str]:
+        """Stream chat completion text as it is generated"""
+        pass
+    
     @abstractmethod
     def get_available_models(self) -> List[str]:
         """Get list of available models"""
         pass
+    
+    def _models_url(self) -> str:
+        """Cheap endpoint used to open a connection ahead of the first request"""
+        return f"{self.base_url}/models"
+    
+    def warm_up(self):
+        """Establish a pooled keep-alive connection; failures are only logged"""
+        try:
+            self._session.get(self._models_url(), timeout=5)
+            logger.info("✅ %s connection warmed up", self.provider)
+        except requests.exceptions.RequestException as e:
+            # Exception text can embed the full request URL; the type is enough here
+            logger.warning("⚠️ %s warm-up failed: %s", self.provider, type(e).__name__)
 
 
 class XAIClient(BaseAIClient):
     """xAI Grok API Client"""
     
+    MODELS: Tuple[str, ...] = (
+        "grok-2-1212",
+        "grok-2-vision-1212",
+        "grok-beta",
+        "grok-vision-beta"
+    )
+    
     def __init__(self, api_key: str):
         self.api_key = api_key
         self.base_url = "https://api.x.ai/v1"
         self.provider = "xAI"
+        self._session = create_session({
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json"
+        })
         
     def chat_completion(self, messages: List[Dict], model: str = "grok-2-1212", 
                        max_tokens: int = 500, temperature: float = 0.1) -> Dict:
         """Generate chat completion using xAI Grok"""
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
-        
         data = {
             "model": model,
             "messages": messages,
@@ -49,48 +209,77 @@ class XAIClient(BaseAIClient):
         }
         
         try:
-            response = requests.post(
+            response = self._session.post(
                 f"{self.base_url}/chat/completions",
-                headers=headers,
-                json=data,
-                timeout=30
+                data=json_dumps(data),
+                timeout=API_TIMEOUT_SECONDS
             )
             
             response.raise_for_status()
-            result = response.json()
-            logger.info(f"✅ xAI ({model}) request successful")
+            result = json_loads(response.content)
+            logger.info("✅ xAI (%s) request successful", model)
             return result
             
-        except requests.exceptions.RequestException as e:
-            logger.error(f"❌ xAI API error: {str(e)}")
-            raise Exception(f"xAI API error: {str(e)}")
+        except (requests.exceptions.RequestException, ValueError) as e:
+            logger.error("❌ %s API error: %s", self.provider, e)
+            raise AIProviderError(self.provider, e) from e
+    
+    def stream_chat_completion(self, messages: List[Dict], model: str = "grok-2-1212",
+                              max_tokens: int = 500, temperature: float = 0.1) -> Iterator[str]:
+        """Stream chat completion text deltas from xAI Grok"""
+        data = {
+            "model": model,
+            "messages": messages,
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+            "stream": True
+        }
+        
+        try:
+            with self._session.post(
+                f"{self.base_url}/chat/completions",
+                data=json_dumps(data),
+                timeout=API_TIMEOUT_SECONDS,
+                stream=True
+            ) as response:
+                response.raise_for_status()
+                for chunk in iter_sse_data(response):
+                    delta = chunk["choices"][0].get("delta", {}).get("content")
+                    if delta:
+                        yield delta
+            
+        except (requests.exceptions.RequestException, ValueError) as e:
+            logger.error("❌ %s API error: %s", self.provider, e)
+            raise AIProviderError(self.provider, e) from e
     
     def get_available_models(self) -> List[str]:
         """Get available xAI models"""
-        return [
-            "grok-2-1212",
-            "grok-2-vision-1212", 
-            "grok-beta",
-            "grok-vision-beta"
-        ]
+        return list(self.MODELS)
 
 
 class GroqClient(BaseAIClient):
     """Groq API Client"""
     
+    MODELS: Tuple[str, ...] = (
+        "llama-3.3-70b-versatile",
+        "llama-3.1-70b-versatile",
+        "llama-3.1-8b-instant",
+        "mixtral-8x7b-32768",
+        "gemma2-9b-it"
+    )
+    
     def __init__(self, api_key: str):
         self.api_key = api_key
         self.base_url = "https://api.groq.com/openai/v1"
         self.provider = "Groq"
+        self._session = create_session({
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json"
+        })
         
     def chat_completion(self, messages: List[Dict], model: str = "llama-3.3-70b-versatile",
                        max_tokens: int = 500, temperature: float = 0.1) -> Dict:
         """Generate chat completion using Groq"""
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json"
-        }
-        
         data = {
             "model": model,
             "messages": messages,
@@ -99,40 +288,75 @@ class GroqClient(BaseAIClient):
         }
         
         try:
-            response = requests.post(
+            response = self._session.post(
                 f"{self.base_url}/chat/completions",
-                headers=headers,
-                json=data,
-                timeout=30
+                data=json_dumps(data),
+                timeout=API_TIMEOUT_SECONDS
             )
             
             response.raise_for_status()
-            result = response.json()
-            logger.info(f"✅ Groq ({model}) request successful")
+            result = json_loads(response.content)
+            logger.info("✅ Groq (%s) request successful", model)
             return result
             
-        except requests.exceptions.RequestException as e:
-            logger.error(f"❌ Groq API error: {str(e)}")
-            raise Exception(f"Groq API error: {str(e)}")
+        except (requests.exceptions.RequestException, ValueError) as e:
+            logger.error("❌ %s API error: %s", self.provider, e)
+            raise AIProviderError(self.provider, e) from e
+    
+    def stream_chat_completion(self, messages: List[Dict], model: str = "llama-3.3-70b-versatile",
+                              max_tokens: int = 500, temperature: float = 0.1) -> Iterator[str]:
+        """Stream chat completion text deltas from Groq"""
+        data = {
+            "model": model,
+            "messages": messages,
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+            "stream": True
+        }
+        
+        try:
+            with self._session.post(
+                f"{self.base_url}/chat/completions",
+                data=json_dumps(data),
+                timeout=API_TIMEOUT_SECONDS,
+                stream=True
+            ) as response:
+                response.raise_for_status()
+                for chunk in iter_sse_data(response):
+                    delta = chunk["choices"][0].get("delta", {}).get("content")
+                    if delta:
+                        yield delta
+            
+        except (requests.exceptions.RequestException, ValueError) as e:
+            logger.error("❌ %s API error: %s", self.provider, e)
+            raise AIProviderError(self.provider, e) from e
     
     def get_available_models(self) -> List[str]:
         """Get available Groq models"""
-        return [
-            "llama-3.3-70b-versatile",
-            "llama-3.1-70b-versatile",
-            "llama-3.1-8b-instant",
-            "mixtral-8x7b-32768",
-            "gemma2-9b-it"
-        ]
+        return list(self.MODELS)
 
 
 class GeminiClient(BaseAIClient):
     """Google Gemini API Client"""
     
+    MODELS: Tuple[str, ...] = (
+        "gemini-1.5-flash",
+        "gemini-1.5-pro",
+        "gemini-pro"
+    )
+    
+    # OpenAI role -> Gemini role (Gemini has no system role)
+    ROLE_MAP: Dict[str, str] = {"user": "user", "system": "user", "assistant": "model"}
+    
     def __init__(self, api_key: str):
         self.api_key = api_key
         self.base_url = "https://generativelanguage.googleapis.com/v1beta"
         self.provider = "Gemini"
+        # Key goes in a header, not the URL, so it never shows up in request errors/logs
+        self._session = create_session({
+            "x-goog-api-key": api_key,
+            "Content-Type": "application/json"
+        })
         
     def chat_completion(self, messages: List[Dict], model: str = "gemini-1.5-flash",
                        max_tokens: int = 500, temperature: float = 0.1) -> Dict:
@@ -141,11 +365,7 @@ class GeminiClient(BaseAIClient):
         # Convert OpenAI format messages to Gemini format
         gemini_messages = self._convert_messages(messages)
         
-        url = f"{self.base_url}/models/{model}:generateContent?key={self.api_key}"
-        
-        headers = {
-            "Content-Type": "application/json"
-        }
+        url = f"{self.base_url}/models/{model}:generateContent"
         
         data = {
             "contents": gemini_messages,
@@ -156,29 +376,50 @@ class GeminiClient(BaseAIClient):
         }
         
         try:
-            response = requests.post(url, headers=headers, json=data, timeout=30)
+            response = self._session.post(url, data=json_dumps(data), timeout=API_TIMEOUT_SECONDS)
             response.raise_for_status()
-            result = response.json()
+            result = json_loads(response.content)
             
             # Convert Gemini response to OpenAI format
             converted_result = self._convert_response(result)
-            logger.info(f"✅ Gemini ({model}) request successful")
+            logger.info("✅ Gemini (%s) request successful", model)
             return converted_result
             
-        except requests.exceptions.RequestException as e:
-            logger.error(f"❌ Gemini API error: {str(e)}")
-            raise Exception(f"Gemini API error: {str(e)}")
+        except (requests.exceptions.RequestException, ValueError) as e:
+            logger.error("❌ %s API error: %s", self.provider, e)
+            raise AIProviderError(self.provider, e) from e
+    
+    def stream_chat_completion(self, messages: List[Dict], model: str = "gemini-1.5-flash",
+                              max_tokens: int = 500, temperature: float = 0.1) -> Iterator[str]:
+        """Stream chat completion text deltas from Gemini"""
+        url = f"{self.base_url}/models/{model}:streamGenerateContent?alt=sse"
+        
+        data = {
+            "contents": self._convert_messages(messages),
+            "generationConfig": {
+                "temperature": temperature,
+                "maxOutputTokens": max_tokens,
+            }
+        }
+        
+        try:
+            with self._session.post(url, data=json_dumps(data), timeout=API_TIMEOUT_SECONDS, stream=True) as response:
+                response.raise_for_status()
+                for chunk in iter_sse_data(response):
+                    for part in chunk.get("candidates", [{}])[0].get("content", {}).get("parts", []):
+                        if part.get("text"):
+                            yield part["text"]
+            
+        except (requests.exceptions.RequestException, ValueError) as e:
+            logger.error("❌ %s API error: %s", self.provider, e)
+            raise AIProviderError(self.provider, e) from e
     
     def _convert_messages(self, messages: List[Dict]) -> List[Dict]:
         """Convert OpenAI format to Gemini format"""
-        gemini_messages = []
-        for msg in messages:
-            role = "user" if msg["role"] in ["user", "system"] else "model"
-            gemini_messages.append({
-                "role": role,
-                "parts": [{"text": msg["content"]}]
-            })
-        return gemini_messages
+        return [
+            {"role": self.ROLE_MAP.get(msg["role"], "model"), "parts": [{"text": msg["content"]}]}
+            for msg in messages
+        ]
     
     def _convert_response(self, response: Dict) -> Dict:
         """Convert Gemini response to OpenAI format"""
@@ -193,16 +434,12 @@ class GeminiClient(BaseAIClient):
                 }]
             }
         except (KeyError, IndexError) as e:
-            logger.error(f"Error parsing Gemini response: {e}")
-            raise Exception(f"Error parsing Gemini response: {e}")
+            logger.error("Error parsing Gemini response: %s", e)
+            raise AIProviderError(self.provider, e, "response could not be parsed") from e
     
     def get_available_models(self) -> List[str]:
         """Get available Gemini models"""
-        return [
-            "gemini-1.5-flash",
-            "gemini-1.5-pro",
-            "gemini-pro"
-        ]
+        return list(self.MODELS)
 
 
 class UnifiedAIClient:
@@ -211,33 +448,45 @@ class UnifiedAIClient:
     Supports: xAI Grok, Groq, Google Gemini
     """
     
+    DEFAULT_MODELS: Dict[str, str] = {
+        "xai": "grok-2-1212",
+        "groq": "llama-3.3-70b-versatile",
+        "gemini": "gemini-1.5-flash"
+    }
+    
     def __init__(self):
         self.clients: Dict[str, BaseAIClient] = {}
         self.active_provider = None
         self.active_model = None
+        self._cache: Optional[LLMResponseCache] = None
+        # provider -> {"fails": consecutive failures, "open_until": monotonic deadline}
+        self._breaker: Dict[str, Dict] = {}
+        self._breaker_lock = threading.Lock()
         
+    def _get_cache(self) -> Optional[LLMResponseCache]:
+        """Open the response cache on first use"""
+        if self._cache is None and ENABLE_CACHING:
+            try:
+                self._cache = LLMResponseCache()
+            except sqlite3.Error as e:
+                logger.warning("⚠️ LLM response cache unavailable: %s", e)
+        return self._cache
+    
     def add_client(self, provider: str, api_key: str):
         """Add an AI provider client"""
         provider_lower = provider.lower()
         
         try:
-            if provider_lower in ["xai", "grok"]:
-                self.clients["xai"] = XAIClient(api_key)
-                logger.info("✅ xAI client initialized")
-                
-            elif provider_lower == "groq":
-                self.clients["groq"] = GroqClient(api_key)
-                logger.info("✅ Groq client initialized")
-                
-            elif provider_lower == "gemini":
-                self.clients["gemini"] = GeminiClient(api_key)
-                logger.info("✅ Gemini client initialized")
-                
-            else:
+            provider_key = "xai" if provider_lower == "grok" else provider_lower
+            if provider_key not in PROVIDER_CLIENTS:
                 raise ValueError(f"Unknown provider: {provider}")
+            
+            client = get_provider_client(provider_key, api_key)
+            self.clients[provider_key] = client
+            logger.info("✅ %s client initialized", client.provider)
                 
         except Exception as e:
-            logger.error(f"❌ Error adding {provider} client: {e}")
+            logger.error("❌ Error adding %s client: %s", provider, e)
             raise
     
     def set_active_provider(self, provider: str, model: str = None):
@@ -250,58 +499,142 @@ class UnifiedAIClient:
         self.active_provider = provider_lower
         
         # Set default model if not provided
-        if model is None:
-            if provider_lower == "xai":
-                model = "grok-2-1212"
-            elif provider_lower == "groq":
-                model = "llama-3.3-70b-versatile"
-            elif provider_lower == "gemini":
-                model = "gemini-1.5-flash"
+        model = model or self.DEFAULT_MODELS[provider_lower]
         
         self.active_model = model
-        logger.info(f"✅ Active provider set to: {provider} ({model})")
+        logger.info("✅ Active provider set to: %s (%s)", provider, model)
     
     def chat_completion(self, messages: List[Dict], max_tokens: int = 500, 
-                       temperature: float = 0.1, **kwargs) -> Dict:
+                       temperature: float = 0.1, no_cache: bool = False, **kwargs) -> Dict:
         """
         Generate chat completion using active provider
         Falls back to other providers if active one fails
+        Low-temperature results are served from the response cache unless no_cache is set
         """
         if not self.active_provider:
             raise ValueError("No active provider set. Use set_active_provider() first")
         
-        # Try active provider first
+        cache = None if no_cache or temperature > LLM_CACHE_MAX_TEMPERATURE else self._get_cache()
+        if cache is None:
+            return self._chat_completion(messages, max_tokens, temperature, **kwargs)[0]
+        
+        key = cache.make_key(self.active_model, messages, max_tokens, temperature)
         try:
-            client = self.clients[self.active_provider]
-            return client.chat_completion(
-                messages=messages,
-                model=self.active_model,
-                max_tokens=max_tokens,
-                temperature=temperature,
-                **kwargs
-            )
-        except Exception as e:
-            logger.warning(f"⚠️ {self.active_provider} failed: {e}")
+            cached = cache.get(key)
+        except sqlite3.Error as e:
+            logger.warning("⚠️ LLM cache read failed: %s", e)
+            cached = None
+        if cached is not None:
+            logger.info("✅ LLM cache hit (%s)", self.active_model)
+            return cached
+        
+        result, answered_by = self._chat_completion(messages, max_tokens, temperature, **kwargs)
+        if answered_by != self.active_provider:
+            # A fallback answer must not be served later as if active_model had produced it
+            return result
+        try:
+            cache.set(key, result)
+        except sqlite3.Error as e:
+            logger.warning("⚠️ LLM cache write failed: %s", e)
+        return result
+    
+    def _is_circuit_open(self, provider: str) -> bool:
+        """Check if a provider is being skipped after repeated failures"""
+        with self._breaker_lock:
+            state = self._breaker.get(provider)
+            return state is not None and time.monotonic() < state["open_until"]
+    
+    def _call_provider(self, provider: str, client: BaseAIClient, **request) -> Dict:
+        """Call a provider, tracking consecutive failures for its circuit breaker"""
+        try:
+            result = client.chat_completion(**request)
+        except Exception:
+            with self._breaker_lock:
+                state = self._breaker.setdefault(provider, {"fails": 0, "open_until": 0.0})
+                state["fails"] += 1
+                if state["fails"] >= CIRCUIT_BREAKER_FAILURE_THRESHOLD:
+                    state["open_until"] = time.monotonic() + CIRCUIT_BREAKER_COOLDOWN_SECONDS
+                    logger.warning("⚠️ %s skipped for %ss after %s failures", provider, CIRCUIT_BREAKER_COOLDOWN_SECONDS, state['fails'])
+            raise
+        
+        with self._breaker_lock:
+            self._breaker.pop(provider, None)
+        return result
+    
+    def _chat_completion(self, messages: List[Dict], max_tokens: int,
+                         temperature: float, **kwargs) -> Tuple[Dict, str]:
+        """Call the active provider, racing the others if it fails
+        Returns the response and the provider that produced it"""
+        last_error = None
+        
+        # Try active provider first, unless its circuit is open
+        if self._is_circuit_open(self.active_provider):
+            logger.warning("⚠️ %s skipped: circuit open after repeated failures", self.active_provider)
+        else:
+            try:
+                return self._call_provider(
+                    self.active_provider,
+                    self.clients[self.active_provider],
+                    messages=messages,
+                    model=self.active_model,
+                    max_tokens=max_tokens,
+                    temperature=temperature,
+                    **kwargs
+                ), self.active_provider
+            except Exception as e:
+                logger.warning("⚠️ %s failed: %s", self.active_provider, e)
+                last_error = e
+        
+        # Race the other providers instead of waiting out each timeout in turn
+        fallbacks = {
+            name: client for name, client in self.clients.items()
+            if name != self.active_provider and not self._is_circuit_open(name)
+        }
+        if fallbacks:
+            executor = ThreadPoolExecutor(max_workers=len(fallbacks))
+            futures = {}
+            for provider_name, client in fallbacks.items():
+                logger.info("🔄 Trying fallback provider: %s", provider_name)
+                futures[executor.submit(
+                    self._call_provider,
+                    provider_name,
+                    client,
+                    messages=messages,
+                    model=client.MODELS[0],  # Use first available model
+                    max_tokens=max_tokens,
+                    temperature=temperature,
+                    **kwargs
+                )] = provider_name
             
-            # Try fallback to other providers
-            for provider_name, client in self.clients.items():
-                if provider_name != self.active_provider:
+            try:
+                for future in as_completed(futures):
                     try:
-                        logger.info(f"🔄 Trying fallback provider: {provider_name}")
-                        models = client.get_available_models()
-                        return client.chat_completion(
-                            messages=messages,
-                            model=models[0],  # Use first available model
-                            max_tokens=max_tokens,
-                            temperature=temperature,
-                            **kwargs
-                        )
+                        return future.result(), futures[future]
                     except Exception as fallback_error:
-                        logger.warning(f"⚠️ {provider_name} fallback failed: {fallback_error}")
-                        continue
-            
-            # All providers failed
-            raise Exception(f"All AI providers failed. Last error: {e}")
+                        logger.warning("⚠️ %s fallback failed: %s", futures[future], fallback_error)
+                        last_error = fallback_error
+            finally:
+                # Don't wait for slower providers once one has answered
+                executor.shutdown(wait=False, cancel_futures=True)
+        
+        # All providers failed
+        raise AllProvidersFailedError(self.active_provider, last_error)
+    
+    def stream_chat_completion(self, messages: List[Dict], max_tokens: int = 500,
+                              temperature: float = 0.1) -> Iterator[str]:
+        """
+        Stream chat completion text from the active provider
+        No fallback or caching: chunks may already have been shown when an error occurs
+        """
+        if not self.active_provider:
+            raise ValueError("No active provider set. Use set_active_provider() first")
+        
+        return self.clients[self.active_provider].stream_chat_completion(
+            messages=messages,
+            model=self.active_model,
+            max_tokens=max_tokens,
+            temperature=temperature
+        )
     
     def get_available_providers(self) -> List[str]:
         """Get list of initialized providers"""
@@ -327,13 +660,36 @@ class UnifiedAIClient:
         }
 
 
+# Provider name -> client class
+PROVIDER_CLIENTS: Dict[str, type] = {
+    "xai": XAIClient,
+    "groq": GroqClient,
+    "gemini": GeminiClient
+}
+
+
+# Background pool for connection warm-ups so add_client never blocks on the network
+_warmup_executor = ThreadPoolExecutor(max_workers=3, thread_name_prefix="ai-warmup")
+
+
+@lru_cache(maxsize=32)
+def get_provider_client(provider: str, api_key: str) -> BaseAIClient:
+    """Get a shared provider client (and its connection pool) for a provider/key pair"""
+    client = PROVIDER_CLIENTS[provider](api_key)
+    _warmup_executor.submit(client.warm_up)
+    return client
+
+
 # Global unified client instance
 _unified_client = None
+_unified_client_lock = threading.Lock()
 
 
 def get_unified_client() -> UnifiedAIClient:
     """Get or create the global unified AI client"""
     global _unified_client
     if _unified_client is None:
-        _unified_client = UnifiedAIClient()
+        with _unified_client_lock:
+            if _unified_client is None:
+                _unified_client = UnifiedAIClient()
     return _unified_client
\ No newline at end of file
@@ -5,14 +5,73 @@ Supabase-based user authentication with registration and login
 
 import streamlit as st
 import hashlib
-from datetime import datetime
-from supabase import create_client, Client
-from database.supabase_manager import get_supabase_manager
-from config.settings import SUPABASE_URL, SUPABASE_KEY, SUPABASE_SERVICE_ROLE_KEY
+import hmac
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Tuple
+from postgrest.exceptions import APIError
+from config.settings import (
+    PASSWORD_MIN_LENGTH,
+    PASSWORD_REQUIRE_SPECIAL_CHAR,
+    PASSWORD_REQUIRE_NUMBER,
+    PASSWORD_REQUIRE_UPPERCASE
+)
+from database.supabase_manager import get_supabase_manager, get_supabase_admin_client
 from utils.logger import get_logger, audit_logger
 
 logger = get_logger(__name__)
 
+# scrypt parameters for password hashing (stdlib, memory-hard)
+SCRYPT_N = 2 ** 14
+SCRYPT_R = 8
+SCRYPT_P = 1
+SCRYPT_DKLEN = 32
+SCRYPT_PREFIX = "scrypt"
+
+# Verified against when the user does not exist, so the KDF always runs
+DUMMY_PASSWORD_HASH = f"{SCRYPT_PREFIX}${SCRYPT_N}${SCRYPT_R}${SCRYPT_P}${'00' * 16}${'00' * SCRYPT_DKLEN}"
+
+
+# Compiled once at import. Usernames are also restricted to characters that
+# are safe inside PostgREST filter strings (no commas, parentheses or spaces)
+EMAIL_PATTERN = re.compile(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}')
+USERNAME_PATTERN = re.compile(r'[a-zA-Z0-9_.-]+')
+
+# Only the rules enabled in settings are checked
+PASSWORD_RULES = tuple(
+    (pattern, message) for enabled, pattern, message in (
+        (PASSWORD_REQUIRE_SPECIAL_CHAR, re.compile(r'[^A-Za-z0-9]'), "a special character"),
+        (PASSWORD_REQUIRE_NUMBER, re.compile(r'\d'), "a number"),
+        (PASSWORD_REQUIRE_UPPERCASE, re.compile(r'[A-Z]'), "an uppercase letter"),
+    ) if enabled
+)
+
+# Explicit projections so user reads don't pull every column over the wire
+USER_PROFILE_COLUMNS = 'id, username, email, full_name, role, is_active'
+USER_AUTH_COLUMNS = f'{USER_PROFILE_COLUMNS}, password_hash'
+
+# Profiles and roles change rarely; get_user_by_username and is_admin answer from memory for this long
+USER_CACHE_TTL_SECONDS = 60
+
+# Login bookkeeping writes run here so the login response doesn't wait on them
+_background_writes = ThreadPoolExecutor(max_workers=2, thread_name_prefix="auth-writes")
+
+
+def validate_password(password: str) -> Tuple[bool, str]:
+    """Check a password against the configured security rules"""
+    if len(password) < PASSWORD_MIN_LENGTH:
+        return False, f"Password must be at least {PASSWORD_MIN_LENGTH} characters"
+    
+    for pattern, requirement in PASSWORD_RULES:
+        if not pattern.search(password):
+            return False, f"Password must contain {requirement}"
+    
+    return True, ""
+
 
 class SupabaseAuthManager:
     """Authentication manager using Supabase database"""
@@ -22,20 +81,47 @@ class SupabaseAuthManager:
         self.client = self.supabase_manager.client if self.supabase_manager.is_connected() else None
         
         # Admin client with service role key for privileged operations
-        self.admin_client = None
-        if SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY:
-            try:
-                self.admin_client = create_client(SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY)
-                logger.info("✅ Admin client initialized with service role key")
-            except Exception as e:
-                logger.error(f"❌ Failed to initialize admin client: {e}")
+        self.admin_client = get_supabase_admin_client()
+        
+        # username -> (profile, monotonic expiry)
+        self._user_cache: dict = {}
         
         if not self.client:
             logger.warning("Supabase not connected - authentication will not work")
     
     def _hash_password(self, password: str) -> str:
-        """Hash password using SHA-256"""
-        return hashlib.sha256(password.encode()).hexdigest()
+        """Hash password with salted scrypt, encoded as scrypt$n$r$p$salt$hash"""
+        salt = os.urandom(16)
+        derived = hashlib.scrypt(
+            password.encode(), salt=salt,
+            n=SCRYPT_N, r=SCRYPT_R, p=SCRYPT_P, dklen=SCRYPT_DKLEN
+        )
+        return f"{SCRYPT_PREFIX}${SCRYPT_N}${SCRYPT_R}${SCRYPT_P}${salt.hex()}${derived.hex()}"
+    
+    def _verify_password(self, password: str, stored_hash: str) -> bool:
+        """Verify password against a stored hash in constant time (scrypt or legacy SHA-256)"""
+        if not stored_hash:
+            return False
+        
+        if stored_hash.startswith(SCRYPT_PREFIX + "$"):
+            try:
+                _, n, r, p, salt_hex, hash_hex = stored_hash.split("$")
+                derived = hashlib.scrypt(
+                    password.encode(), salt=bytes.fromhex(salt_hex),
+                    n=int(n), r=int(r), p=int(p), dklen=len(hash_hex) // 2
+                )
+            except ValueError:
+                logger.error("Malformed scrypt password hash")
+                return False
+            return hmac.compare_digest(derived.hex(), hash_hex)
+        
+        # Legacy unsalted SHA-256 hashes (upgraded on next successful login)
+        legacy_hash = hashlib.sha256(password.encode()).hexdigest()
+        return hmac.compare_digest(legacy_hash, stored_hash)
+    
+    def _needs_rehash(self, stored_hash: str) -> bool:
+        """Check if a stored hash predates the current scrypt parameters"""
+        return not stored_hash.startswith(f"{SCRYPT_PREFIX}${SCRYPT_N}${SCRYPT_R}${SCRYPT_P}$")
     
     def register_user(self, username: str, email: str, password: str, full_name: str = "") -> tuple[bool, str]:
         """Register a new user in Supabase"""
@@ -46,31 +132,37 @@ class SupabaseAuthManager:
             if not username or not email or not password:
                 return False, "All fields are required"
             
-            if len(password) < 8:
-                return False, "Password must be at least 8 characters"
-            
-            if "@" not in email:
-                return False, "Invalid email address"
+            valid, message = validate_password(password)
+            if not valid:
+                return False, message
             
-            existing = self.client.table('users').select('*').or_(
-                f'username.eq.{username},email.eq.{email}'
-            ).execute()
+            if not USERNAME_PATTERN.fullmatch(username):
+                return False, "Username may only contain letters, numbers, '.', '-' and '_'"
             
-            if existing.data:
-                return False, "Username or email already exists"
+            if not EMAIL_PATTERN.fullmatch(email):
+                return False, "Invalid email address"
             
             password_hash = self._hash_password(password)
+            # created_at/updated_at come from the column defaults
             user_data = {
                 "username": username,
                 "email": email,
                 "password_hash": password_hash,
                 "full_name": full_name,
                 "role": "user",
-                "is_active": True,
-                "created_at": datetime.utcnow().isoformat()
+                "is_active": True
             }
             
-            response = self.client.table('users').insert(user_data).execute()
+            # The UNIQUE constraints on username/email reject duplicates in the same round trip
+            try:
+                response = self.client.table('users').insert(user_data).execute()
+            except APIError as e:
+                if e.code == "23505":  # unique_violation
+                    # details: 'Key (username)=(...) already exists.'; message names the constraint
+                    if "(username)" in (e.details or "") or "users_username_key" in (e.message or ""):
+                        return False, "Username already exists"
+                    return False, "Email already registered"
+                raise
             
             if response.data:
                 logger.info(f"New user registered: {username}")
@@ -83,52 +175,83 @@ class SupabaseAuthManager:
             logger.error(f"Registration error: {e}")
             return False, f"Registration failed: {str(e)}"
     
+    def _check_credentials(self, username: str, password: str) -> tuple[bool, str, dict]:
+        """Verify a username/email and password without any login side effects"""
+        # One indexed equality lookup instead of an OR across two columns
+        column = 'email' if '@' in username else 'username'
+        response = self.client.table('users').select(USER_AUTH_COLUMNS).eq(column, username).limit(1).execute()
+        
+        user = response.data[0] if response.data else None
+        
+        # Same KDF cost whether or not the username exists
+        stored_hash = user['password_hash'] if user else DUMMY_PASSWORD_HASH
+        password_ok = self._verify_password(password, stored_hash)
+        
+        if user and password_ok and not user.get('is_active', True):
+            return False, "Account is deactivated", {}
+        
+        if not (user and password_ok):
+            return False, "Invalid username or password", {}
+        
+        return True, "", user
+    
     def authenticate_user(self, username: str, password: str) -> tuple[bool, str, dict]:
         """Authenticate user against Supabase database"""
         try:
             if not self.client:
                 return False, "Database connection not available", {}
             
-            response = self.client.table('users').select('*').or_(
-                f'username.eq.{username},email.eq.{username}'
-            ).execute()
+            success, message, user = self._check_credentials(username, password)
+            if not success:
+                return False, message, {}
             
-            if not response.data:
-                return False, "Invalid username or password", {}
+            login_update = {'last_login': datetime.now(timezone.utc).isoformat()}
             
-            user = response.data[0]
+            # Transparently upgrade legacy hashes in the same round trip. That write
+            # stays synchronous so a password change made right after the login
+            # can't be overwritten by a late upgrade.
+            if self._needs_rehash(user['password_hash']):
+                login_update['password_hash'] = self._hash_password(password)
+                self._record_login(user['id'], login_update)
+            else:
+                _background_writes.submit(self._record_login, user['id'], login_update)
             
-            if not user.get('is_active', True):
-                return False, "Account is deactivated", {}
+            logger.info(f"User logged in: {user['username']}")
+            audit_logger.log_user_action(user['username'], "login", "User logged in successfully")
             
-            password_hash = self._hash_password(password)
-            if user['password_hash'] == password_hash:
-                # Use admin client to update last login (bypass RLS)
-                update_client = self.admin_client if self.admin_client else self.client
-                update_client.table('users').update({
-                    'last_login': datetime.utcnow().isoformat()
-                }).eq('id', user['id']).execute()
-                
-                logger.info(f"User logged in: {user['username']}")
-                audit_logger.log_user_action(user['username'], "login", "User logged in successfully")
-                
-                return True, "Login successful", user
-            else:
-                return False, "Invalid username or password", {}
+            return True, "Login successful", user
                 
         except Exception as e:
             logger.error(f"Authentication error: {e}")
             return False, f"Login failed: {str(e)}", {}
     
+    def _record_login(self, user_id: str, login_update: dict):
+        """Persist last login (and any upgraded hash) for a user"""
+        try:
+            # Use admin client to update last login (bypass RLS)
+            update_client = self.admin_client if self.admin_client else self.client
+            update_client.table('users').update(login_update).eq('id', user_id).execute()
+        except Exception as e:
+            logger.error(f"Error recording login for user {user_id}: {e}")
+    
     def get_user_by_username(self, username: str) -> dict:
-        """Get user data by username"""
+        """Get user data by username (cached for USER_CACHE_TTL_SECONDS)"""
+        cached = self._user_cache.get(username)
+        if cached is not None and cached[1] > time.monotonic():
+            return dict(cached[0])
+        
         try:
             client = self.admin_client if self.admin_client else self.client
             if not client:
                 return {}
             
-            response = client.table('users').select('*').eq('username', username).execute()
-            return response.data[0] if response.data else {}
+            response = client.table('users').select(USER_PROFILE_COLUMNS).eq('username', username).limit(1).execute()
+            if not response.data:
+                return {}
+            
+            user = response.data[0]
+            self._user_cache[username] = (user, time.monotonic() + USER_CACHE_TTL_SECONDS)
+            return dict(user)
         except Exception as e:
             logger.error(f"Error fetching user: {e}")
             return {}
@@ -152,21 +275,23 @@ class SupabaseAuthManager:
             if not self.client:
                 return False, "Database connection not available"
             
-            success, message, user = self.authenticate_user(username, old_password)
+            # Cheap rule check before paying for the KDF and a database round trip
+            valid, message = validate_password(new_password)
+            if not valid:
+                return False, message
+            
+            # Verify in place: a password change isn't a login, so no last_login
+            # write and no login audit event
+            success, message, user = self._check_credentials(username, old_password)
             if not success:
                 return False, "Current password is incorrect"
             
-            if len(new_password) < 8:
-                return False, "New password must be at least 8 characters"
-            
             new_hash = self._hash_password(new_password)
             
             # Use admin client for update (bypass RLS)
             update_client = self.admin_client if self.admin_client else self.client
-            update_client.table('users').update({
-                'password_hash': new_hash,
-                'updated_at': datetime.utcnow().isoformat()
-            }).eq('id', user['id']).execute()
+            # updated_at is set by the update_users_updated_at trigger
+            update_client.table('users').update({'password_hash': new_hash}).eq('id', user['id']).execute()
             
             logger.info(f"Password updated for user: {username}")
             audit_logger.log_user_action(username, "password_change", "Password changed successfully")
@@ -177,6 +302,18 @@ class SupabaseAuthManager:
             logger.error(f"Password update error: {e}")
             return False, f"Failed to update password: {str(e)}"
     
+    def _set_users_active(self, usernames: list, active: bool):
+        """Set is_active for several users in one request"""
+        self.admin_client.table('users').update({'is_active': active}).in_('username', usernames).execute()
+        for username in usernames:
+            self._user_cache.pop(username, None)
+    
+    def _delete_users(self, usernames: list):
+        """Delete several users in one request"""
+        self.admin_client.table('users').delete().in_('username', usernames).execute()
+        for username in usernames:
+            self._user_cache.pop(username, None)
+    
     def deactivate_user(self, username: str) -> tuple[bool, str]:
         """Deactivate a user account (admin only - uses service role)"""
         try:
@@ -186,10 +323,7 @@ class SupabaseAuthManager:
             if username == "admin":
                 return False, "Cannot deactivate admin account"
             
-            self.admin_client.table('users').update({
-                'is_active': False,
-                'updated_at': datetime.utcnow().isoformat()
-            }).eq('username', username).execute()
+            self._set_users_active([username], False)
             
             logger.info(f"User deactivated: {username}")
             audit_logger.log_user_action("admin", "deactivate_user", f"Deactivated user: {username}")
@@ -200,16 +334,34 @@ class SupabaseAuthManager:
             logger.error(f"Error deactivating user: {e}")
             return False, f"Failed to deactivate user: {str(e)}"
     
+    def deactivate_users(self, usernames: list) -> tuple[bool, str]:
+        """Deactivate several user accounts in one request (admin only - uses service role)"""
+        try:
+            if not self.admin_client:
+                return False, "Admin privileges required. Service role key not configured."
+            
+            usernames = [username for username in usernames if username != "admin"]
+            if not usernames:
+                return False, "No users selected"
+            
+            self._set_users_active(usernames, False)
+            
+            logger.info(f"Users deactivated: {', '.join(usernames)}")
+            audit_logger.log_user_action("admin", "deactivate_users", f"Deactivated users: {', '.join(usernames)}")
+            
+            return True, f"{len(usernames)} user(s) deactivated successfully"
+            
+        except Exception as e:
+            logger.error(f"Error deactivating users: {e}")
+            return False, f"Failed to deactivate users: {str(e)}"
+    
     def activate_user(self, username: str) -> tuple[bool, str]:
         """Activate a user account (admin only - uses service role)"""
         try:
             if not self.admin_client:
                 return False, "Admin privileges required. Service role key not configured."
             
-            self.admin_client.table('users').update({
-                'is_active': True,
-                'updated_at': datetime.utcnow().isoformat()
-            }).eq('username', username).execute()
+            self._set_users_active([username], True)
             
             logger.info(f"User activated: {username}")
             audit_logger.log_user_action("admin", "activate_user", f"Activated user: {username}")
@@ -220,6 +372,26 @@ class SupabaseAuthManager:
             logger.error(f"Error activating user: {e}")
             return False, f"Failed to activate user: {str(e)}"
     
+    def activate_users(self, usernames: list) -> tuple[bool, str]:
+        """Activate several user accounts in one request (admin only - uses service role)"""
+        try:
+            if not self.admin_client:
+                return False, "Admin privileges required. Service role key not configured."
+            
+            if not usernames:
+                return False, "No users selected"
+            
+            self._set_users_active(usernames, True)
+            
+            logger.info(f"Users activated: {', '.join(usernames)}")
+            audit_logger.log_user_action("admin", "activate_users", f"Activated users: {', '.join(usernames)}")
+            
+            return True, f"{len(usernames)} user(s) activated successfully"
+            
+        except Exception as e:
+            logger.error(f"Error activating users: {e}")
+            return False, f"Failed to activate users: {str(e)}"
+    
     def delete_user(self, username: str) -> tuple[bool, str]:
         """Delete a user account (admin only - uses service role)"""
         try:
@@ -229,7 +401,7 @@ class SupabaseAuthManager:
             if username == "admin":
                 return False, "Cannot delete admin account"
             
-            self.admin_client.table('users').delete().eq('username', username).execute()
+            self._delete_users([username])
             
             logger.info(f"User deleted: {username}")
             audit_logger.log_user_action("admin", "delete_user", f"Deleted user: {username}")
@@ -240,24 +412,74 @@ class SupabaseAuthManager:
             logger.error(f"Error deleting user: {e}")
             return False, f"Failed to delete user: {str(e)}"
     
+    def delete_users(self, usernames: list) -> tuple[bool, str]:
+        """Delete several user accounts in one request (admin only - uses service role)"""
+        try:
+            if not self.admin_client:
+                return False, "Admin privileges required. Service role key not configured."
+            
+            usernames = [username for username in usernames if username != "admin"]
+            if not usernames:
+                return False, "No users selected"
+            
+            self._delete_users(usernames)
+            
+            logger.info(f"Users deleted: {', '.join(usernames)}")
+            audit_logger.log_user_action("admin", "delete_users", f"Deleted users: {', '.join(usernames)}")
+            
+            return True, f"{len(usernames)} user(s) deleted successfully"
+            
+        except Exception as e:
+            logger.error(f"Error deleting users: {e}")
+            return False, f"Failed to delete users: {str(e)}"
+    
     def is_admin(self, username: str) -> bool:
         """Check if user is admin"""
-        user = self.get_user_by_username(username)
-        return user.get('role') == 'admin'
+        return self.get_user_by_username(username).get('role') == 'admin'
+
+
+# Global instance
+_auth_manager = None
+_auth_manager_lock = threading.Lock()
+
+
+def get_auth_manager() -> SupabaseAuthManager:
+    """Get or create the process-wide auth manager (reused across Streamlit reruns)"""
+    global _auth_manager
+    if _auth_manager is None:
+        with _auth_manager_lock:
+            if _auth_manager is None:
+                _auth_manager = SupabaseAuthManager()
+    return _auth_manager
+
+
+# Static login page markup, built once at import
+_LOGIN_HEADER_HTML = """
+<div style="text-align: center; padding: 2rem;">
+    <h1>🔐 VexaAI Data Analyst Pro</h1>
+    <p>Welcome! Please login or create an account</p>
+</div>
+"""
+
+_PASSWORD_REQUIREMENTS = ", ".join(
+    [f"At least {PASSWORD_MIN_LENGTH} characters"] + [f"contains {rule}" for _, rule in PASSWORD_RULES]
+)
+
+_LOGIN_FOOTER_HTML = """
+<div style="text-align: center; color: #666;">
+    <p>🔒 Your data is secure and encrypted</p>
+    <p>Developed by John Evans Okyere | VexaAI © 2025</p>
+</div>
+"""
 
 
 def show_login_page():
     """Show the login page with tabs for login and registration"""
-    st.markdown("""
-    <div style="text-align: center; padding: 2rem;">
-        <h1>🔐 VexaAI Data Analyst Pro</h1>
-        <p>Welcome! Please login or create an account</p>
-    </div>
-    """, unsafe_allow_html=True)
+    st.html(_LOGIN_HEADER_HTML)
     
-    tab1, tab2 = st.tabs(["🔑 Login", "📝 Register"])
+    tab1, tab2 = st.tabs(["🔑 Login to Your Account", "📝 Create New Account"])
     
-    auth_manager = SupabaseAuthManager()
+    auth_manager = get_auth_manager()
     
     if not auth_manager.client:
         st.error("❌ Database connection not available. Please configure Supabase in your .env file.")
@@ -265,8 +487,6 @@ def show_login_page():
         return
     
     with tab1:
-        st.markdown("### 🔑 Login to Your Account")
-        
         with st.form("login_form"):
             login_username = st.text_input("Username or Email", placeholder="Enter username or email")
             login_password = st.text_input("Password", type="password", placeholder="Enter password")
@@ -274,7 +494,8 @@ def show_login_page():
             
             if login_button:
                 if login_username and login_password:
-                    success, message, user_data = auth_manager.authenticate_user(login_username, login_password)
+                    with st.spinner("Verifying..."):
+                        success, message, user_data = auth_manager.authenticate_user(login_username, login_password)
                     if success:
                         st.session_state.authenticated = True
                         st.session_state.username = user_data['username']
@@ -292,13 +513,16 @@ def show_login_page():
 
     
     with tab2:
-        st.markdown("### 📝 Create New Account")
-        
         with st.form("register_form"):
             reg_username = st.text_input("Username", placeholder="Choose a unique username")
             reg_email = st.text_input("Email", placeholder="Enter your email address")
             reg_full_name = st.text_input("Full Name (optional)", placeholder="Your full name")
-            reg_password = st.text_input("Password", type="password", placeholder="At least 8 characters")
+            reg_password = st.text_input(
+                "Password",
+                type="password",
+                placeholder=f"At least {PASSWORD_MIN_LENGTH} characters",
+                help=_PASSWORD_REQUIREMENTS
+            )
             reg_confirm_password = st.text_input("Confirm Password", type="password", placeholder="Re-enter password")
             register_button = st.form_submit_button("✨ Create Account", use_container_width=True)
             
@@ -307,15 +531,16 @@ def show_login_page():
                     st.error("❌ Please fill in all required fields")
                 elif reg_password != reg_confirm_password:
                     st.error("❌ Passwords do not match")
-                elif len(reg_password) < 8:
-                    st.error("❌ Password must be at least 8 characters")
+                elif len(reg_password) < PASSWORD_MIN_LENGTH:
+                    st.error(f"❌ Password must be at least {PASSWORD_MIN_LENGTH} characters")
                 else:
-                    success, message = auth_manager.register_user(
-                        username=reg_username,
-                        email=reg_email,
-                        password=reg_password,
-                        full_name=reg_full_name
-                    )
+                    with st.spinner("Creating account..."):
+                        success, message = auth_manager.register_user(
+                            username=reg_username,
+                            email=reg_email,
+                            password=reg_password,
+                            full_name=reg_full_name
+                        )
                     if success:
                         st.success(f"✅ {message}")
                         st.info("👈 Please go to the Login tab to sign in")
@@ -323,24 +548,18 @@ def show_login_page():
                         st.error(f"❌ {message}")
     
     st.markdown("---")
-    st.markdown("""
-    <div style="text-align: center; color: #666;">
-        <p>🔒 Your data is secure and encrypted</p>
-        <p>Developed by John Evans Okyere | VexaAI © 2025</p>
-    </div>
-    """, unsafe_allow_html=True)
+    st.html(_LOGIN_FOOTER_HTML)
 
 
 def check_authentication() -> bool:
     """Check if user is authenticated"""
-    if "authenticated" not in st.session_state:
-        st.session_state.authenticated = False
-    
-    if not st.session_state.authenticated:
-        show_login_page()
-        return False
+    # Fast path: authenticated sessions never touch the auth manager or Supabase
+    if st.session_state.get("authenticated"):
+        return True
     
-    return True
+    st.session_state.setdefault("authenticated", False)
+    show_login_page()
+    return False
 
 
 # ==================== BACKWARD COMPATIBILITY ====================
@@ -38,11 +38,15 @@ class DataAnalyzer:
             Dict containing basic stats, missing values, data types, etc.
         """
         try:
+            # One null scan and one nunique pass, reused by the categorical summaries
+            missing_counts = self.df.isnull().sum()
+            unique_counts = self.df.nunique()
+            
             summary = {
                 "basic_stats": {},
-                "missing_values": self.df.isnull().sum().to_dict(),
+                "missing_values": missing_counts.to_dict(),
                 "data_types": self.df.dtypes.astype(str).to_dict(),
-                "unique_counts": self.df.nunique().to_dict(),
+                "unique_counts": unique_counts.to_dict(),
                 "memory_usage": self.df.memory_usage(deep=True).sum() / 1024  # KB
             }
             
@@ -56,11 +60,12 @@ class DataAnalyzer:
                 for col in self.categorical_cols:
                     try:
                         value_counts = self.df[col].value_counts().head(10)
+                        missing = int(missing_counts[col])
                         summary["categorical_stats"][col] = {
-                            "unique_values": int(self.df[col].nunique()),
+                            "unique_values": int(unique_counts[col]),
                             "top_values": value_counts.to_dict(),
-                            "missing": int(self.df[col].isnull().sum()),
-                            "missing_pct": float(self.df[col].isnull().sum() / len(self.df) * 100)
+                            "missing": missing,
+                            "missing_pct": float(missing / len(self.df) * 100)
                         }
                     except Exception as e:
                         logger.warning(f"Error processing categorical column {col}: {e}")
@@ -176,7 +181,7 @@ class DataAnalyzer:
                 "statistic": float(statistic),
                 "p_value": float(p_value),
                 "cohens_d": float(cohens_d),
-                "significant": p_value < 0.05,
+                "significant": bool(p_value < 0.05),
                 "interpretation": self._interpret_t_test(p_value, cohens_d, alternative)
             }
             
@@ -20,21 +20,23 @@ from core.ai_client import get_unified_client
 logger = get_logger(__name__)
 
 
-def preprocess_and_save(file):
+def preprocess_and_save(file, filename=None):
     """
     Preprocess uploaded file and return DataFrame
     
     Args:
-        file: Uploaded file object
+        file: Uploaded file object (any readable, seekable binary stream)
+        filename: Original file name, if the stream has no usable .name
     
     Returns:
         pd.DataFrame: Preprocessed dataframe
     """
     try:
-        if file.name.endswith('.csv'):
+        filename = filename or file.name
+        if filename.endswith('.csv'):
             file.seek(0)
             df = pd.read_csv(file, encoding='utf-8', na_values=['NA', 'N/A', 'missing'])
-        elif file.name.endswith('.xlsx'):
+        elif filename.endswith('.xlsx'):
             file.seek(0)
             df = pd.read_excel(file, na_values=['NA', 'N/A', 'missing'])
         else:
@@ -70,30 +72,9 @@ def preprocess_and_save(file):
         raise Exception(f"Error processing file: {e}")
 
 
-def generate_sql_query(user_query, columns, table_name="data", client=None):
-    """
-    Generate SQL query from natural language using AI
-    
-    Args:
-        user_query: Natural language question
-        columns: List of column names
-        table_name: Name of the table (default: "data")
-        client: AI client instance (optional)
-    
-    Returns:
-        str: SQL query
-    """
-    
-    # If no client provided, get the unified client
-    if client is None:
-        client = get_unified_client()
-        if not client.active_provider:
-            raise Exception("No AI provider configured. Please configure an AI provider first.")
-    
-    column_info = ", ".join(columns)
-    
-    # Enhanced prompt with specific examples
-    prompt = f"""You are an expert SQL query generator. Convert the user's question into a valid, complete, executable SQL query.
+# Prompt templates are built once at import; only the placeholders vary per call
+# Enhanced prompt with specific examples
+SQL_PROMPT_TEMPLATE = """You are an expert SQL query generator. Convert the user's question into a valid, complete, executable SQL query.
 
 DATABASE SCHEMA:
 Table name: {table_name}
@@ -138,6 +119,49 @@ SQL: SELECT COUNT(*) as total FROM {table_name} WHERE Churn = 1
 USER QUESTION: {user_query}
 
 IMPORTANT: Return ONLY the complete SQL query. No explanations, no markdown, no code blocks, just the raw SQL query."""
+
+INTERPRETATION_PROMPT_TEMPLATE = """Analyze the following query results and provide a clear, concise interpretation:
+
+Original Question: {query}
+SQL Query Used: {sql_query}
+Results ({row_count} rows):
+{results_preview}
+
+Please provide:
+1. A summary of what the data shows
+2. Key insights or patterns
+3. Direct answer to the original question
+
+Keep the response clear and business-friendly. Do not use markdown formatting."""
+
+
+def generate_sql_query(user_query, columns, table_name="data", client=None):
+    """
+    Generate SQL query from natural language using AI
+    
+    Args:
+        user_query: Natural language question
+        columns: List of column names
+        table_name: Name of the table (default: "data")
+        client: AI client instance (optional)
+    
+    Returns:
+        str: SQL query
+    """
+    
+    # If no client provided, get the unified client
+    if client is None:
+        client = get_unified_client()
+        if not client.active_provider:
+            raise Exception("No AI provider configured. Please configure an AI provider first.")
+    
+    column_info = ", ".join(columns)
+    
+    prompt = SQL_PROMPT_TEMPLATE.format(
+        table_name=table_name,
+        column_info=column_info,
+        user_query=user_query
+    )
     
     try:
         messages = [{"role": "user", "content": prompt}]
@@ -246,6 +270,19 @@ def execute_query(df, sql_query):
         raise Exception(f"Error executing query: {e}")
 
 
+def _interpretation_messages(query, sql_query, results):
+    """Build the chat messages asking the AI to interpret query results"""
+    results_preview = results.head(10).to_string() if len(results) > 10 else results.to_string()
+    
+    prompt = INTERPRETATION_PROMPT_TEMPLATE.format(
+        query=query,
+        sql_query=sql_query,
+        row_count=len(results),
+        results_preview=results_preview
+    )
+    return [{"role": "user", "content": prompt}]
+
+
 def interpret_results(query, sql_query, results, client=None):
     """
     Generate AI interpretation of query results
@@ -266,24 +303,8 @@ def interpret_results(query, sql_query, results, client=None):
         if not client.active_provider:
             return "AI interpretation unavailable - no provider configured"
     
-    results_preview = results.head(10).to_string() if len(results) > 10 else results.to_string()
-    
-    prompt = f"""Analyze the following query results and provide a clear, concise interpretation:
-
-Original Question: {query}
-SQL Query Used: {sql_query}
-Results ({len(results)} rows):
-{results_preview}
-
-Please provide:
-1. A summary of what the data shows
-2. Key insights or patterns
-3. Direct answer to the original question
-
-Keep the response clear and business-friendly. Do not use markdown formatting."""
-    
     try:
-        messages = [{"role": "user", "content": prompt}]
+        messages = _interpretation_messages(query, sql_query, results)
         response = client.chat_completion(
             messages=messages,
             max_tokens=400,
@@ -296,6 +317,46 @@ Keep the response clear and business-friendly. Do not use markdown formatting.""
         return f"Results retrieved successfully, but couldn't generate interpretation: {e}"
 
 
+def stream_interpretation(query, sql_query, results, client=None):
+    """
+    Generate AI interpretation of query results, yielding text as it arrives
+    
+    Args:
+        query: Original natural language question
+        sql_query: SQL query that was executed
+        results: Query results DataFrame
+        client: AI client instance (optional)
+    
+    Yields:
+        str: Pieces of the interpretation; joined they form the full text
+    """
+    
+    # If no client provided, get the unified client
+    if client is None:
+        client = get_unified_client()
+        if not client.active_provider:
+            yield "AI interpretation unavailable - no provider configured"
+            return
+    
+    streamed = False
+    try:
+        for chunk in client.stream_chat_completion(
+            messages=_interpretation_messages(query, sql_query, results),
+            max_tokens=400,
+            temperature=0.3
+        ):
+            streamed = True
+            yield chunk
+    except Exception as e:
+        if streamed:
+            logger.warning(f"Interpretation stream interrupted: {e}")
+            yield f"\n\n(Interpretation interrupted: {e})"
+        else:
+            # Nothing shown yet, so the non-streaming path can still try the fallback providers
+            logger.warning(f"Interpretation stream failed, retrying without streaming: {e}")
+            yield interpret_results(query, sql_query, results, client)
+
+
 def get_data_profile(df):
     """
     Generate comprehensive data profile
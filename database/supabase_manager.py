@@ -4,17 +4,42 @@ Handles all database operations with Supabase
 """
 
 import os
+import threading
+import uuid
+from pathlib import Path
 from typing import Dict, List, Optional, Any
-from datetime import datetime
 import json
+import httpx
 import pandas as pd
-from supabase import create_client, Client
-from config.settings import SUPABASE_URL, SUPABASE_KEY, DB_TABLES
+from supabase import create_client, Client, ClientOptions
+from config.settings import (
+    SUPABASE_URL, SUPABASE_KEY, SUPABASE_SERVICE_ROLE_KEY, DB_TABLES, DATASET_STORE_DIR,
+    SUPABASE_MAX_CONNECTIONS, SUPABASE_MAX_KEEPALIVE_CONNECTIONS,
+    SUPABASE_KEEPALIVE_EXPIRY_SECONDS, SUPABASE_TIMEOUT_SECONDS, SUPABASE_CONNECT_RETRIES
+)
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
 
+def pooled_client_options() -> ClientOptions:
+    """Client options with an explicitly sized, keep-alive httpx pool"""
+    transport = httpx.HTTPTransport(
+        retries=SUPABASE_CONNECT_RETRIES,
+        limits=httpx.Limits(
+            max_connections=SUPABASE_MAX_CONNECTIONS,
+            max_keepalive_connections=SUPABASE_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=SUPABASE_KEEPALIVE_EXPIRY_SECONDS
+        )
+    )
+    http_client = httpx.Client(
+        transport=transport,
+        timeout=SUPABASE_TIMEOUT_SECONDS,
+        follow_redirects=True
+    )
+    return ClientOptions(httpx_client=http_client)
+
+
 class SupabaseManager:
     """Manager class for Supabase operations"""
     
@@ -29,7 +54,7 @@ class SupabaseManager:
         """Initialize the Supabase client"""
         try:
             if self.url and self.key:
-                self.client = create_client(self.url, self.key)
+                self.client = create_client(self.url, self.key, options=pooled_client_options())
                 logger.info("✅ Supabase client initialized successfully")
             else:
                 logger.warning("⚠️ Supabase credentials not found in environment")
@@ -69,15 +94,13 @@ class SupabaseManager:
                 "rows": rows,
                 "columns": columns,
                 "column_info": column_info,  # Already a dict, don't JSON stringify
-                "metadata": metadata or {},
-                "created_at": datetime.utcnow().isoformat(),
-                "updated_at": datetime.utcnow().isoformat()
+                "metadata": metadata or {}
             }
             
             logger.info(f"Attempting to save dataset: {dataset_name}")
             response = self.client.table("datasets").insert(data).execute()
             
-            if response.data and len(response.data) > 0:
+            if response.data:
                 dataset_id = response.data[0]["id"]
                 logger.info(f"✅ Dataset saved successfully: {dataset_id}")
                 return dataset_id
@@ -137,6 +160,11 @@ class SupabaseManager:
                 return False
             
             self.client.table("datasets").delete().eq("id", dataset_id).execute()
+            
+            path = self._dataset_path(dataset_id)
+            if path is not None:
+                path.unlink(missing_ok=True)
+            
             logger.info(f"Dataset deleted: {dataset_id}")
             return True
             
@@ -144,6 +172,61 @@ class SupabaseManager:
             logger.error(f"Error deleting dataset: {e}")
             return False
     
+    # The rows themselves live on local disk (Supabase only holds the metadata)
+    
+    def _dataset_path(self, dataset_id: str) -> Optional[Path]:
+        """Parquet path for a dataset, or None if the id is not a UUID"""
+        try:
+            return DATASET_STORE_DIR / f"{uuid.UUID(str(dataset_id))}.parquet"
+        except ValueError:
+            return None
+    
+    @staticmethod
+    def _parquet_safe(df: pd.DataFrame) -> pd.DataFrame:
+        """Convert mixed-type object columns (e.g. ints and strings from xlsx) to strings, keeping nulls"""
+        mixed = [
+            col for col in df.columns[df.dtypes == object]
+            if pd.api.types.infer_dtype(df[col], skipna=True).startswith("mixed")
+        ]
+        if not mixed:
+            return df
+        
+        df = df.copy()
+        for col in mixed:
+            df[col] = df[col].astype(str).where(df[col].notna(), None)
+        return df
+    
+    def save_dataset_frame(self, dataset_id: str, df: pd.DataFrame) -> bool:
+        """Store an uploaded dataset's rows for later loading"""
+        try:
+            path = self._dataset_path(dataset_id)
+            if path is None:
+                logger.error(f"Invalid dataset id: {dataset_id}")
+                return False
+            
+            DATASET_STORE_DIR.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(".tmp")
+            self._parquet_safe(df).to_parquet(tmp_path, index=False)
+            os.replace(tmp_path, path)
+            return True
+            
+        except Exception as e:
+            logger.error(f"Error storing dataset {dataset_id}: {e}")
+            return False
+    
+    def load_dataset(self, dataset_id: str) -> Optional[pd.DataFrame]:
+        """Load a stored dataset's rows, or None if it was never stored"""
+        try:
+            path = self._dataset_path(dataset_id)
+            if path is None or not path.exists():
+                return None
+            
+            return pd.read_parquet(path)
+            
+        except Exception as e:
+            logger.error(f"Error loading dataset {dataset_id}: {e}")
+            return None
+    
     # ==================== DATA VERSION OPERATIONS ====================
     
     def save_data_version(
@@ -172,13 +255,12 @@ class SupabaseManager:
                 "rows_after": rows_after,
                 "columns_before": columns_before,
                 "columns_after": columns_after,
-                "metadata": metadata or {},
-                "created_at": datetime.utcnow().isoformat()
+                "metadata": metadata or {}
             }
             
             response = self.client.table("data_versions").insert(data).execute()
             
-            if response.data and len(response.data) > 0:
+            if response.data:
                 version_id = response.data[0]["id"]
                 logger.info(f"✅ Data version saved: {version_id}")
                 return version_id
@@ -233,13 +315,12 @@ class SupabaseManager:
                 "sql_query": sql_query,
                 "results_preview": results_preview,
                 "interpretation": interpretation,
-                "execution_time": execution_time,
-                "created_at": datetime.utcnow().isoformat()
+                "execution_time": execution_time
             }
             
             response = self.client.table("analysis_history").insert(data).execute()
             
-            if response.data and len(response.data) > 0:
+            if response.data:
                 analysis_id = response.data[0]["id"]
                 logger.info(f"✅ Analysis saved: {analysis_id}")
                 return analysis_id
@@ -289,13 +370,12 @@ class SupabaseManager:
                 "user_id": user_id,
                 "activity_type": activity_type,
                 "description": description,
-                "metadata": metadata or {},
-                "timestamp": datetime.utcnow().isoformat()
+                "metadata": metadata or {}
             }
             
             response = self.client.table("audit_logs").insert(data).execute()
             
-            if response.data and len(response.data) > 0:
+            if response.data:
                 log_id = response.data[0]["id"]
                 return log_id
             
@@ -342,13 +422,12 @@ class SupabaseManager:
             data = {
                 "dataset_id": dataset_id,
                 "report_data": report_data,  # Already a dict
-                "quality_score": quality_score,
-                "created_at": datetime.utcnow().isoformat()
+                "quality_score": quality_score
             }
             
             response = self.client.table("data_quality_reports").insert(data).execute()
             
-            if response.data and len(response.data) > 0:
+            if response.data:
                 report_id = response.data[0]["id"]
                 logger.info(f"✅ Data quality report saved: {report_id}")
                 return report_id
@@ -393,4 +472,25 @@ def get_supabase_manager() -> SupabaseManager:
     global _supabase_manager
     if _supabase_manager is None:
         _supabase_manager = SupabaseManager()
-    return _supabase_manager
\ No newline at end of file
+    return _supabase_manager
+
+
+# Global admin client (service role key, bypasses RLS)
+_supabase_admin_client = None
+_supabase_admin_client_lock = threading.Lock()
+
+
+def get_supabase_admin_client() -> Optional[Client]:
+    """Get or create the process-wide Supabase admin client"""
+    global _supabase_admin_client
+    if _supabase_admin_client is None and SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY:
+        with _supabase_admin_client_lock:
+            if _supabase_admin_client is None:
+                try:
+                    _supabase_admin_client = create_client(
+                        SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY, options=pooled_client_options()
+                    )
+                    logger.info("✅ Admin client initialized with service role key")
+                except Exception as e:
+                    logger.error(f"❌ Failed to initialize admin client: {e}")
+    return _supabase_admin_client
\ No newline at end of file
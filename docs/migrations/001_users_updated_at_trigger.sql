@@ -0,0 +1,22 @@
+-- VexaAI Data Analyst Pro - Migration 001
+-- For databases created from an earlier docs/supabase_schema.sql.
+-- The app no longer sends updated_at on user updates, so this trigger sets it.
+-- Safe to run more than once.
+
+CREATE OR REPLACE FUNCTION update_users_updated_at_column()
+RETURNS TRIGGER AS $$
+BEGIN
+    -- last_login is login bookkeeping, not a profile change
+    IF (to_jsonb(NEW) - 'last_login' - 'updated_at') IS DISTINCT FROM
+       (to_jsonb(OLD) - 'last_login' - 'updated_at') THEN
+        NEW.updated_at = CURRENT_TIMESTAMP;
+    END IF;
+    RETURN NEW;
+END;
+$$ language 'plpgsql';
+
+DROP TRIGGER IF EXISTS update_users_updated_at ON users;
+CREATE TRIGGER update_users_updated_at
+    BEFORE UPDATE ON users
+    FOR EACH ROW
+    EXECUTE FUNCTION update_users_updated_at_column();
@@ -104,6 +104,25 @@ CREATE TRIGGER update_datasets_updated_at
     FOR EACH ROW
     EXECUTE FUNCTION update_updated_at_column();
 
+-- Create trigger for users table (the app no longer sends updated_at)
+CREATE OR REPLACE FUNCTION update_users_updated_at_column()
+RETURNS TRIGGER AS $$
+BEGIN
+    -- last_login is login bookkeeping, not a profile change
+    IF (to_jsonb(NEW) - 'last_login' - 'updated_at') IS DISTINCT FROM
+       (to_jsonb(OLD) - 'last_login' - 'updated_at') THEN
+        NEW.updated_at = CURRENT_TIMESTAMP;
+    END IF;
+    RETURN NEW;
+END;
+$$ language 'plpgsql';
+
+DROP TRIGGER IF EXISTS update_users_updated_at ON users;
+CREATE TRIGGER update_users_updated_at
+    BEFORE UPDATE ON users
+    FOR EACH ROW
+    EXECUTE FUNCTION update_users_updated_at_column();
+
 -- Enable Row Level Security (RLS)
 ALTER TABLE datasets ENABLE ROW LEVEL SECURITY;
 ALTER TABLE data_versions ENABLE ROW LEVEL SECURITY;
@@ -7,32 +7,11 @@ import pandas as pd
 import sys
 from pathlib import Path
 import time
-import io
 from datetime import datetime
 
-sys.path.insert(0, str(Path(__file__).parent.parent))
-
-from core.auth import check_authentication
-from core.ml_engine import GroqClient, generate_sql_query, execute_query, interpret_results
-from core.data_analysis import DataAnalyzer
-from utils.logger import get_logger, audit_logger
-
-logger = get_logger(__name__)
-
-st.set_page_config(page_title="Analysis & Insights", page_icon="📈", layout="wide")
-
-"""
-Analysis & Insights Page - AI Queries and Statistical Tests
-"""
-
-import streamlit as st
-import pandas as pd
-import sys
-from pathlib import Path
-import time
-from datetime import datetime
-
-sys.path.insert(0, str(Path(__file__).parent.parent))
+_ROOT_DIR = str(Path(__file__).parent.parent)
+if _ROOT_DIR not in sys.path:
+    sys.path.insert(0, _ROOT_DIR)
 
 from core.auth import check_authentication
 from core.ml_engine import generate_sql_query, execute_query, interpret_results
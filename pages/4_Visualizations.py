@@ -7,7 +7,9 @@ import plotly.express as px
 import plotly.graph_objects as go
 import sys
 from pathlib import Path
-sys.path.insert(0, str(Path(__file__).parent.parent))
+_ROOT_DIR = str(Path(__file__).parent.parent)
+if _ROOT_DIR not in sys.path:
+    sys.path.insert(0, _ROOT_DIR)
 from core.auth import check_authentication
 from utils.logger import get_logger
 logger = get_logger(__name__)
@@ -9,7 +9,9 @@ import plotly.graph_objects as go
 import sys
 from pathlib import Path
 
-sys.path.insert(0, str(Path(__file__).parent.parent))
+_ROOT_DIR = str(Path(__file__).parent.parent)
+if _ROOT_DIR not in sys.path:
+    sys.path.insert(0, _ROOT_DIR)
 
 from core.auth import check_authentication
 from utils.helpers import calculate_data_quality_score, get_column_info
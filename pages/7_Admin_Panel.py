@@ -7,9 +7,11 @@ import pandas as pd
 import sys
 from pathlib import Path
 
-sys.path.insert(0, str(Path(__file__).parent.parent))
+_ROOT_DIR = str(Path(__file__).parent.parent)
+if _ROOT_DIR not in sys.path:
+    sys.path.insert(0, _ROOT_DIR)
 
-from core.auth import check_authentication, SupabaseAuthManager
+from core.auth import check_authentication, get_auth_manager
 from database.supabase_manager import get_supabase_manager
 from utils.ui_components import apply_modern_css, render_page_header, render_section_header
 from utils.logger import get_logger
@@ -41,7 +43,7 @@ def main():
     )
     
     # Initialize auth manager
-    auth_manager = SupabaseAuthManager()
+    auth_manager = get_auth_manager()
     db_manager = get_supabase_manager()
     
     # Create tabs
@@ -89,14 +91,17 @@ def main():
             st.markdown("---")
             render_section_header("🔧 User Actions")
             
+            # Admin accounts are not managed from here
+            manageable_users = [u['username'] for u in users if u.get('role') != 'admin']
+            
             col1, col2 = st.columns(2)
             
             with col1:
-                st.markdown("**Activate/Deactivate User**")
+                st.markdown("**Activate/Deactivate Users**")
                 
-                user_to_modify = st.selectbox(
-                    "Select User",
-                    options=[u['username'] for u in users if u['username'] != 'admin'],
+                users_to_modify = st.multiselect(
+                    "Select Users",
+                    options=manageable_users,
                     key="modify_user"
                 )
                 
@@ -104,7 +109,7 @@ def main():
                 
                 with action_col1:
                     if st.button("✅ Activate", use_container_width=True):
-                        success, message = auth_manager.activate_user(user_to_modify)
+                        success, message = auth_manager.activate_users(users_to_modify)
                         if success:
                             st.success(message)
                             st.rerun()
@@ -113,7 +118,7 @@ def main():
                 
                 with action_col2:
                     if st.button("🚫 Deactivate", use_container_width=True):
-                        success, message = auth_manager.deactivate_user(user_to_modify)
+                        success, message = auth_manager.deactivate_users(users_to_modify)
                         if success:
                             st.warning(message)
                             st.rerun()
@@ -121,17 +126,17 @@ def main():
                             st.error(message)
             
             with col2:
-                st.markdown("**Delete User**")
+                st.markdown("**Delete Users**")
                 st.warning("⚠️ This action cannot be undone!")
                 
-                user_to_delete = st.selectbox(
-                    "Select User to Delete",
-                    options=[u['username'] for u in users if u['username'] != 'admin'],
+                users_to_delete = st.multiselect(
+                    "Select Users to Delete",
+                    options=manageable_users,
                     key="delete_user"
                 )
                 
-                if st.button("🗑️ Delete User", use_container_width=True, type="primary"):
-                    success, message = auth_manager.delete_user(user_to_delete)
+                if st.button("🗑️ Delete Users", use_container_width=True, type="primary"):
+                    success, message = auth_manager.delete_users(users_to_delete)
                     if success:
                         st.success(message)
                         st.rerun()
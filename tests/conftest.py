@@ -0,0 +1,6 @@
+# tests/conftest.py
+import sys
+from pathlib import Path
+
+# Same import setup as the app entry points: project root on sys.path
+sys.path.insert(0, str(Path(__file__).parent.parent))
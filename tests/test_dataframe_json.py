@@ -0,0 +1,49 @@
+# tests/test_dataframe_json.py
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backend_api import main
+
+
+@pytest.fixture(params=["orjson", "stdlib"])
+def encoder(request, monkeypatch):
+    if request.param == "stdlib":
+        monkeypatch.setattr(main, "orjson", None)
+    elif main.orjson is None:
+        pytest.skip("orjson not installed")
+    return request.param
+
+
+def test_floats_round_trip_at_full_precision(encoder):
+    values = [0.1234567890123456, 1e-12, 5e-324, 1e300, -2.5, 0.1 + 0.2]
+    df = pd.DataFrame({"x": values, "y": np.array(values) * 3})
+    
+    decoded = json.loads(main.dataframe_json({"rows": len(df)}, "results", df))
+    
+    assert decoded["rows"] == len(df)
+    assert [row["x"] for row in decoded["results"]] == values
+    assert [row["y"] for row in decoded["results"]] == (np.array(values) * 3).tolist()
+
+
+def test_missing_values_and_dates_become_json(encoder):
+    df = pd.DataFrame({
+        "f": [1.5, np.nan],
+        "s": ["a", None],
+        "d": pd.to_datetime(["2024-01-02T03:04:05", None]),
+        "i": np.array([1, 2], dtype=np.int64)
+    })
+    
+    decoded = json.loads(main.dataframe_json({}, "preview", df))
+    
+    assert decoded == {"preview": [
+        {"f": 1.5, "s": "a", "d": "2024-01-02T03:04:05", "i": 1},
+        {"f": None, "s": None, "d": None, "i": 2}
+    ]}
+
+
+def test_records_key_is_escaped(encoder):
+    decoded = json.loads(main.dataframe_json({"a": 1}, 'odd"key', pd.DataFrame({"x": [1]})))
+    assert decoded == {"a": 1, 'odd"key': [{"x": 1}]}
@@ -0,0 +1,42 @@
+# tests/test_dataset_store.py
+import uuid
+
+import pandas as pd
+import pytest
+
+from database import supabase_manager
+from database.supabase_manager import SupabaseManager
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(supabase_manager, "DATASET_STORE_DIR", tmp_path)
+    # The dataset store only touches the local filesystem, so skip the client setup
+    return object.__new__(SupabaseManager)
+
+
+def test_mixed_object_columns_are_stored_as_strings(store):
+    dataset_id = str(uuid.uuid4())
+    df = pd.DataFrame({
+        "code": [1, "A2", 3.5, None],
+        "name": ["a", "b", "c", None],
+        "value": [1.5, 2.0, None, 4.25],
+    })
+    
+    assert store.save_dataset_frame(dataset_id, df)
+    loaded = store.load_dataset(dataset_id)
+    
+    assert loaded["code"].tolist()[:3] == ["1", "A2", "3.5"]
+    assert loaded["code"].isna().tolist() == [False, False, False, True]
+    assert loaded["name"].tolist()[:3] == ["a", "b", "c"]
+    pd.testing.assert_series_equal(loaded["value"], df["value"])
+    # The caller's frame is left untouched
+    assert df["code"].tolist()[:3] == [1, "A2", 3.5]
+
+
+def test_invalid_or_missing_dataset_ids(store):
+    df = pd.DataFrame({"a": [1]})
+    
+    assert not store.save_dataset_frame("../escape", df)
+    assert store.load_dataset("../escape") is None
+    assert store.load_dataset(str(uuid.uuid4())) is None